@@ -5,8 +5,9 @@ import sys
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
-from typing import Dict, List, Tuple, Union
-from llm_config.llm_call import generate_text
+from typing import AsyncIterator, Dict, Iterator, List, Tuple, Union
+from llm_config.llm_call import generate_text_stream, agenerate_text_stream, generate_many
+from llm_config.llm_tokens import compact_records, count_tokens, get_stage_budget
 
 class SQLAnalyzer:
     def main_analyzer(self, query_info: str, query_results: List[Dict], llm_model: str = "mistral:instruct") -> Dict[str, Union[bool, str, int, dict]]:
@@ -27,23 +28,42 @@ class SQLAnalyzer:
             - error: error message if any
         """
         try:
-            # Create analysis prompt
-            prompt = f"""
-            Analyze the following data based on the query:
-            "{query_info}"
-
-            Data (list of records):
-            {query_results}
-
-            Provide a comprehensive analysis including:
-            1. Key findings and patterns
-            2. Notable relationships between metrics
-            3. Important trends or anomalies
-            4. Actionable insights and recommendations
-            """
+            # Collect the streamed analysis from LLM
+            analysis = "".join(self.stream_analyzer(query_info, query_results, llm_model=llm_model)).strip()
             
-            # Get analysis from LLM
-            analysis = generate_text(prompt, model=llm_model)
+            return {
+                "success": True,
+                "query_info": query_info,
+                "record_count": len(query_results),
+                "analysis": analysis,
+                "error": None
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "query_info": query_info,
+                "record_count": 0,
+                "analysis": None,
+                "error": str(e)
+            }
+
+    async def amain_analyzer(self, query_info: str, query_results: List[Dict], llm_model: str = "mistral:instruct") -> Dict[str, Union[bool, str, int, dict]]:
+        """
+        Asynchronous version of main_analyzer, so several models can analyze the same
+        results concurrently.
+        
+        Args:
+            query_info: Original query information
+            query_results: List of dictionaries containing query results
+            llm_model: The LLM model to use for analysis (default: "mistral:instruct")
+        
+        Returns:
+            Same dictionary as main_analyzer
+        """
+        try:
+            chunks = [chunk async for chunk in self.astream_analyzer(query_info, query_results, llm_model=llm_model)]
+            analysis = "".join(chunks).strip()
             
             return {
                 "success": True,
@@ -60,4 +80,87 @@ class SQLAnalyzer:
                 "record_count": 0,
                 "analysis": None,
                 "error": str(e)
-            } 
\ No newline at end of file
+            }
+
+    def stream_analyzer(self, query_info: str, query_results: List[Dict], llm_model: str = "mistral:instruct") -> Iterator[str]:
+        """
+        Stream the analysis of SQL query results token by token as the LLM generates it
+        
+        Args:
+            query_info: Original query information
+            query_results: List of dictionaries containing query results
+            llm_model: The LLM model to use for analysis (default: "mistral:instruct")
+        
+        Yields:
+            Chunks of the analysis text
+        """
+        yield from generate_text_stream(self._build_prompt(query_info, query_results), model=llm_model, stage="analyzer")
+
+    async def astream_analyzer(self, query_info: str, query_results: List[Dict], llm_model: str = "mistral:instruct") -> AsyncIterator[str]:
+        """
+        Asynchronous version of stream_analyzer
+        
+        Args:
+            query_info: Original query information
+            query_results: List of dictionaries containing query results
+            llm_model: The LLM model to use for analysis (default: "mistral:instruct")
+        
+        Yields:
+            Chunks of the analysis text
+        """
+        async for chunk in agenerate_text_stream(self._build_prompt(query_info, query_results), model=llm_model, stage="analyzer"):
+            yield chunk
+
+    def main_analyzer_batch(self, query_infos: List[str], query_results_list: List[List[Dict]], llm_model: str = "mistral:instruct", max_workers: int = 8) -> List[Dict[str, Union[bool, str, int, dict]]]:
+        """
+        Analyze the results of many queries, sending the LLM calls concurrently.
+        
+        Args:
+            query_infos: Original query information for each result set
+            query_results_list: Query results for each query
+            llm_model: The LLM model to use for analysis (default: "mistral:instruct")
+            max_workers: Maximum number of LLM calls in flight at once
+        
+        Returns:
+            One dictionary per query, in input order, shaped like the main_analyzer response
+        """
+        prompts = [self._build_prompt(query_info, query_results) for query_info, query_results in zip(query_infos, query_results_list)]
+        generations = generate_many(prompts, model=llm_model, max_workers=max_workers, stage="analyzer")
+        
+        return [
+            {
+                "success": generation["error"] is None,
+                "query_info": query_info,
+                "record_count": len(query_results) if generation["error"] is None else 0,
+                "analysis": generation["text"],
+                "error": generation["error"]
+            }
+            for query_info, query_results, generation in zip(query_infos, query_results_list, generations)
+        ]
+
+    def _build_prompt(self, query_info: str, query_results: List[Dict]) -> str:
+        """
+        Build the analysis prompt from the query and its results.
+        Results are sent as a compact table (column names once), truncated to the analyzer token budget.
+        """
+        budget = get_stage_budget("analyzer")
+        data_budget = budget - count_tokens(self._format_prompt(query_info, "")) if budget is not None else float("inf")
+        
+        # Create analysis prompt
+        return self._format_prompt(query_info, compact_records(query_results, data_budget))
+
+    def _format_prompt(self, query_info: str, data: str) -> str:
+        """Fill the analysis prompt template."""
+        return f"""
+        Analyze the following data based on the query:
+        "{query_info}"
+
+        Data (first line has the column names, then one record per line, values separated by |):
+{data}
+
+        Provide a comprehensive analysis including:
+        1. Key findings and patterns
+        2. Notable relationships between metrics
+        3. Important trends or anomalies
+        4. Actionable insights and recommendations
+        """
@@ -1,3 +1,4 @@
+import time
 from analyzer import SQLAnalyzer
 
 def main():
@@ -27,5 +28,15 @@ def main():
     else:
         print(f"Analysis failed: {analysis_results['error']}")
 
+    # Test streaming analysis
+    print("\nStreaming Analysis:")
+    start = time.perf_counter()
+    first_token_time = None
+    for chunk in analyzer.stream_analyzer(test_query, test_results, llm_model=llm_model):
+        if first_token_time is None:
+            first_token_time = time.perf_counter() - start
+        print(chunk, end="", flush=True)
+    print(f"\n\nTime to first token: {first_token_time:.2f}s, total: {time.perf_counter() - start:.2f}s")
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
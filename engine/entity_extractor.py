@@ -6,7 +6,7 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
 from typing import Dict, List
-from llm_config.llm_call import generate_text
+from llm_config.llm_call import generate_text, agenerate_text, generate_many
 
 class EntityExtractor:
     def main_entity_extractor(self, sql_query: str, llm_model: str = "mistral:instruct") -> List[Dict]:
@@ -20,6 +20,55 @@ class EntityExtractor:
         Returns:
             List of dictionaries containing table, column, value mappings
         """
+        # Get entity mapping from LLM
+        entity_text = generate_text(self._build_prompt(sql_query), model=llm_model, stage="entity_extractor")
+        
+        return self._parse_entities(entity_text)
+
+    async def amain_entity_extractor(self, sql_query: str, llm_model: str = "mistral:instruct") -> List[Dict]:
+        """
+        Asynchronous version of main_entity_extractor, so several models can extract
+        entities from the same query concurrently.
+        
+        Args:
+            sql_query: SQL query to analyze
+            llm_model: The LLM model to use for extraction (default: "mistral:instruct")
+            
+        Returns:
+            List of dictionaries containing table, column, value mappings
+        """
+        entity_text = await agenerate_text(self._build_prompt(sql_query), model=llm_model, stage="entity_extractor")
+        
+        return self._parse_entities(entity_text)
+
+    def main_entity_extractor_batch(self, sql_queries: List[str], llm_model: str = "mistral:instruct", max_workers: int = 8) -> List[Dict]:
+        """
+        Extract entities from many SQL queries, sending the LLM calls concurrently.
+        
+        Args:
+            sql_queries: SQL queries to analyze
+            llm_model: The LLM model to use for extraction (default: "mistral:instruct")
+            max_workers: Maximum number of LLM calls in flight at once
+            
+        Returns:
+            One dictionary per query, in input order, containing:
+                - sql_query: Input SQL query
+                - entities: List of table, column, value mappings
+                - error: Error message if extraction failed
+        """
+        generations = generate_many([self._build_prompt(sql_query) for sql_query in sql_queries], model=llm_model, max_workers=max_workers, stage="entity_extractor")
+        
+        return [
+            {
+                "sql_query": sql_query,
+                "entities": self._parse_entities(generation["text"]) if generation["error"] is None else [],
+                "error": generation["error"]
+            }
+            for sql_query, generation in zip(sql_queries, generations)
+        ]
+
+    def _build_prompt(self, sql_query: str) -> str:
+        """Build the entity extraction prompt for a SQL query."""
         extraction_prompt = f"""You are an SQL entity extractor. Your ONLY task is to extract real-world entities.
 
 Format: table_name|column_name|comparison_value
@@ -78,9 +127,10 @@ CRITICAL INSTRUCTIONS:
 - ONLY output the exact table_name|column_name|comparison_value format for valid entities.
 - ANY other output format is considered an error."""
         
-        # Get entity mapping from LLM
-        entity_text = generate_text(f"{extraction_prompt}\n\nQuery: {sql_query}", model=llm_model)
-        
+        return f"{extraction_prompt}\n\nQuery: {sql_query}"
+
+    def _parse_entities(self, entity_text: str) -> List[Dict]:
+        """Parse and validate table|column|value lines returned by the LLM."""
         # Parse and validate extracted entities
         extracted_entities = []
         for line in entity_text.strip().split('\n'):
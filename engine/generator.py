@@ -5,14 +5,19 @@ import sys
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
-from typing import Dict
-from llm_config.llm_call import generate_text
+import asyncio
+from typing import Dict, List, Tuple
+from llm_config.llm_call import generate_text, agenerate_text, generate_many
+from llm_config.llm_tokens import count_tokens, fit_sections, get_stage_budget
 from utils.schema_embedder import SchemaEmbedder
 
 class SQLGenerator:
     def __init__(self):
         self.schema_embedder = SchemaEmbedder()
-        self.db_schema_path = os.path.join(project_root, 'utils', 'db_schema.pkl')
+        self.db_schema_path = os.path.join(project_root, 'utils', 'db_schema_store')
+        # Most relevant columns sent per table (None sends every column). The committed store has no
+        # column embeddings yet; set this (e.g. to 8) once it has been rebuilt with create_db_schema
+        self.columns_per_table = None
 
     def main_generator(self, user_query: str, llm_model: str = "mistral:instruct") -> Dict:
         """
@@ -29,25 +34,100 @@ class SQLGenerator:
                 - formatted_metadata: Formatted table and column information
                 - generated_sql: Single SQL query (no additional text/explanations)
         """
-        # Get relevant tables and columns using schema embedder
-        relevant_tables = self.schema_embedder.query_tables(user_query, self.db_schema_path)
+        formatted_metadata, initial_prompt = self._build_prompt(user_query)
         
-        # Format table and column information
-        formatted_metadata = []
-        for table_name, columns in relevant_tables:
-            formatted_metadata.append(f"{table_name} ({', '.join(columns)})")
+        generated_sql = generate_text(initial_prompt, model=llm_model, stage="generator")
+
+        # Return results
+        return {
+            "user_query": user_query,
+            "formatted_metadata": formatted_metadata,
+            "generated_sql": generated_sql
+        }
+
+    async def amain_generator(self, user_query: str, llm_model: str = "mistral:instruct") -> Dict:
+        """
+        Asynchronous version of main_generator.
+        Schema retrieval runs in a worker thread and the LLM call is awaited, so several
+        models can generate SQL for the same query concurrently.
+        
+        Args:
+            user_query: Natural language query from user
+            llm_model: The LLM model to use for generation (default: "mistral:instruct")
             
-            # Add a blank line between tables for readability
-            formatted_metadata.append("")
+        Returns:
+            Same dictionary as main_generator
+        """
+        formatted_metadata, initial_prompt = await asyncio.to_thread(self._build_prompt, user_query)
         
-        formatted_metadata = "\n".join(formatted_metadata)
+        generated_sql = await agenerate_text(initial_prompt, model=llm_model, stage="generator")
 
-        # Generate SQL
-        initial_prompt = f"""Given these tables and columns:
-{formatted_metadata}
+        # Return results
+        return {
+            "user_query": user_query,
+            "formatted_metadata": formatted_metadata,
+            "generated_sql": generated_sql
+        }
 
-Generate a single SQL query for this request:
-{user_query}
+    def main_generator_batch(self, user_queries: List[str], llm_model: str = "mistral:instruct", max_workers: int = 8) -> List[Dict]:
+        """
+        Generate SQL for many user queries, sending the LLM calls concurrently.
+        
+        Args:
+            user_queries: Natural language queries
+            llm_model: The LLM model to use for generation (default: "mistral:instruct")
+            max_workers: Maximum number of LLM calls in flight at once
+            
+        Returns:
+            One dictionary per query, in input order, with the keys of main_generator plus:
+                - error: Error message if generation failed (generated_sql is then None)
+        """
+        prompts = [self._build_prompt(user_query) for user_query in user_queries]
+        generations = generate_many([prompt for _, prompt in prompts], model=llm_model, max_workers=max_workers, stage="generator")
+        
+        return [
+            {
+                "user_query": user_query,
+                "formatted_metadata": formatted_metadata,
+                "generated_sql": generation["text"],
+                "error": generation["error"]
+            }
+            for user_query, (formatted_metadata, _), generation in zip(user_queries, prompts, generations)
+        ]
+
+    def _build_prompt(self, user_query: str) -> Tuple[str, str]:
+        """
+        Retrieve relevant schema for the query and build the generation prompt.
+        Tables are added in relevance order until the generator token budget is used up.
+        The kept tables are then listed by name, so queries retrieving the same tables share
+        an identical prompt prefix (instructions and schema) that provider-side prompt caching can reuse.
+        
+        Returns:
+            Tuple of (formatted_metadata, prompt)
+        """
+        # Precomputed snippets of the relevant tables and their most relevant columns
+        relevant_tables = self.schema_embedder.query_snippets(user_query, self.db_schema_path,
+                                                              columns_per_table=self.columns_per_table)
+        table_sections = [snippet for _, snippet in relevant_tables]
+        
+        # Keep the most relevant tables that fit the budget left after the fixed prompt text
+        budget = get_stage_budget("generator")
+        if budget is not None:
+            metadata_budget = budget - count_tokens(self._format_prompt("", user_query))
+            kept_sections = fit_sections(table_sections, metadata_budget, separator="\n\n")
+            if len(kept_sections) < len(table_sections):
+                print(f"Generator prompt budget: kept {len(kept_sections)} of {len(table_sections)} tables")
+            table_sections = kept_sections
+        
+        # Stable order, with a blank line between tables for readability
+        formatted_metadata = "\n".join(f"{section}\n" for section in sorted(table_sections))
+
+        # Build the SQL generation prompt
+        return formatted_metadata, self._format_prompt(formatted_metadata, user_query)
+
+    def _format_prompt(self, formatted_metadata: str, user_query: str) -> str:
+        """Fill the SQL generation prompt template: fixed instructions, then schema, then the request."""
+        return f"""Generate a single SQL query for the request at the end, using only the tables and columns listed.
 
 Requirements:
 - Return ONLY the raw SQL query text, no markdown formatting
@@ -56,13 +136,10 @@ Requirements:
 - The query can be simple or complex depending on what's needed
 - Use appropriate JOINs, subqueries, or aggregations if required
 - Ensure the query is complete and executable
-- When filtering on columns with choices, use the exact choice values provided in the metadata"""
-        
-        generated_sql = generate_text(initial_prompt, model=llm_model)
+- When filtering on columns with choices, use the exact choice values provided in the metadata
 
-        # Return results
-        return {
-            "user_query": user_query,
-            "formatted_metadata": formatted_metadata,
-            "generated_sql": generated_sql
-        }
\ No newline at end of file
+Given these tables and columns (name type [choices]):
+{formatted_metadata}
+
+Generate a single SQL query for this request:
+{user_query}"""
@@ -1,3 +1,5 @@
+import asyncio
+import time
 from generator import SQLGenerator
 
 def main():
@@ -23,5 +25,51 @@ def main():
     except Exception as e:
         print(f"Error: {str(e)}")
 
+    asyncio.run(_check_concurrent_models())
+    _check_batch()
+
+async def _check_concurrent_models():
+    """Test concurrent SQL generation with two models"""
+    generator = SQLGenerator()
+    
+    query = "Show the FPS Inspection Allocation Report from May 1, 2025 to May 14, 2025 for district 209."
+    models = ["deepseek-chat", "mistralai/Mistral-7B-Instruct-v0.3"]
+
+    print("\nTesting concurrent SQL generation:")
+    print(f"\nUsing LLM models: {', '.join(models)}")
+    
+    try:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(generator.amain_generator(query, llm_model=model) for model in models))
+        print(f"\nBoth models finished in {time.perf_counter() - start:.2f}s")
+        for model, result in zip(models, results):
+            print(f"\nGenerated SQL ({model}):")
+            print(result['generated_sql'])
+        
+    except Exception as e:
+        print(f"Error: {str(e)}")
+
+def _check_batch():
+    """Test batch SQL generation for several queries"""
+    generator = SQLGenerator()
+    
+    queries = [
+        "Show all FPS inspections assigned to 40015297.",
+        "List the districts with the most inspections in May 2025.",
+        "Who all have admin permissions?"
+    ]
+    llm_model = "deepseek-chat"
+
+    print("\nTesting batch SQL generation:")
+    start = time.perf_counter()
+    results = generator.main_generator_batch(queries, llm_model=llm_model, max_workers=4)
+    print(f"\n{len(results)} queries finished in {time.perf_counter() - start:.2f}s")
+    for result in results:
+        print(f"\nQuery: '{result['user_query']}'")
+        if result['error']:
+            print(f"Error: {result['error']}")
+        else:
+            print(f"Generated SQL: {result['generated_sql']}")
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
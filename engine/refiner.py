@@ -6,7 +6,7 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
 from typing import Dict, List
-from llm_config.llm_call import generate_text
+from llm_config.llm_call import generate_text, agenerate_text, generate_many
 
 class SQLRefiner:
     def main_refiner(self, sql_query: str, value_mappings: List[Dict], llm_model: str = "mistral:instruct") -> Dict:
@@ -44,15 +44,79 @@ class SQLRefiner:
             }
 
         # Refine SQL with filtered mappings
-        refinement_prompt = f"""Return ONLY the modified SQL query with these replacements:
-{chr(10).join(f"{m['original_value']} -> {m['matched_value']}" for m in filtered_mappings)}
-Query: {sql_query}"""
-        
-        refined_sql = generate_text(refinement_prompt, model=llm_model)
+        refined_sql = generate_text(self._build_prompt(sql_query, filtered_mappings), model=llm_model, stage="refiner")
 
         # Return results
         return {
             "original_sql": sql_query,
             "value_mappings": value_mappings,
             "refined_sql": refined_sql
-        }
\ No newline at end of file
+        }
+
+    async def amain_refiner(self, sql_query: str, value_mappings: List[Dict], llm_model: str = "mistral:instruct") -> Dict:
+        """
+        Asynchronous version of main_refiner, so several models can refine the same
+        query concurrently.
+        
+        Args:
+            sql_query: SQL query to refine
+            value_mappings: List of dictionaries containing original and matched values
+            llm_model: The LLM model to use for refinement (default: "mistral:instruct")
+            
+        Returns:
+            Same dictionary as main_refiner
+        """
+        filtered_mappings = [mapping for mapping in value_mappings if mapping.get("score", 0) != 100]
+        
+        # Nothing to refine, main_refiner returns the original query without an LLM call
+        if not filtered_mappings:
+            return self.main_refiner(sql_query, value_mappings, llm_model=llm_model)
+
+        refined_sql = await agenerate_text(self._build_prompt(sql_query, filtered_mappings), model=llm_model, stage="refiner")
+
+        return {
+            "original_sql": sql_query,
+            "value_mappings": value_mappings,
+            "refined_sql": refined_sql
+        }
+
+    def main_refiner_batch(self, sql_queries: List[str], value_mappings_list: List[List[Dict]], llm_model: str = "mistral:instruct", max_workers: int = 8) -> List[Dict]:
+        """
+        Refine many SQL queries, sending the LLM calls concurrently.
+        Queries without mappings to apply are returned unchanged without an LLM call.
+        
+        Args:
+            sql_queries: SQL queries to refine
+            value_mappings_list: Value mappings for each query
+            llm_model: The LLM model to use for refinement (default: "mistral:instruct")
+            max_workers: Maximum number of LLM calls in flight at once
+            
+        Returns:
+            One dictionary per query, in input order, with the keys of main_refiner plus:
+                - error: Error message if refinement failed (refined_sql is then None)
+        """
+        results = []
+        pending = []  # (result index, prompt)
+        for sql_query, value_mappings in zip(sql_queries, value_mappings_list):
+            filtered_mappings = [mapping for mapping in value_mappings if mapping.get("score", 0) != 100]
+            results.append({
+                "original_sql": sql_query,
+                "value_mappings": value_mappings,
+                "refined_sql": sql_query,
+                "error": None
+            })
+            if filtered_mappings:
+                pending.append((len(results) - 1, self._build_prompt(sql_query, filtered_mappings)))
+        
+        generations = generate_many([prompt for _, prompt in pending], model=llm_model, max_workers=max_workers, stage="refiner")
+        for (index, _), generation in zip(pending, generations):
+            results[index]["refined_sql"] = generation["text"]
+            results[index]["error"] = generation["error"]
+        
+        return results
+
+    def _build_prompt(self, sql_query: str, filtered_mappings: List[Dict]) -> str:
+        """Build the refinement prompt from the SQL query and the mappings to apply."""
+        return f"""Return ONLY the modified SQL query with these replacements:
+{chr(10).join(f"{m['original_value']} -> {m['matched_value']}" for m in filtered_mappings)}
+Query: {sql_query}"""
@@ -6,9 +6,14 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
 from typing import Dict, List
-from utils.search import search_term_in_column
+from concurrent.futures import ThreadPoolExecutor
+from utils.search import search_term_in_column, search_terms_in_column
 
 class ValueMatcher:
+    def __init__(self):
+        # Matches must score above this to be used
+        self.min_match_score = 45
+
     def main_value_matcher(self, entity: Dict) -> List[Dict]:
         """
         Find matching values in the database for a single extracted entity
@@ -20,16 +25,58 @@ class ValueMatcher:
             List of dictionaries containing original value, matched value and match score
         """
         value_mappings = []
-        min_match_score = 45
         match = search_term_in_column(
             term=entity['value'],
             table_name=entity['table'],
-            column_name=entity['column']
+            column_name=entity['column'],
+            score_cutoff=self.min_match_score
         )
-        if match and match.get('score', 0) > min_match_score:
+        if match and match.get('score', 0) > self.min_match_score:
             value_mappings.append({
                 "original_value": entity['value'],
                 "matched_value": match['matched_value'],
                 "score": match['score']
             })
-        return value_mappings 
\ No newline at end of file
+        return value_mappings
+
+    def match_entities(self, entities: List[Dict], max_workers: int = 8) -> List[Dict]:
+        """
+        Find matching values for all extracted entities at once.
+        Entities are grouped by (table, column) so each column is read once and all of its
+        terms are scored in one batch; different columns are matched concurrently.
+        
+        Args:
+            entities: Dictionaries containing table, column, value mapping
+            max_workers: Maximum number of columns matched at once
+            
+        Returns:
+            Value mappings of all entities, in entity order (as from main_value_matcher for each)
+        """
+        columns = {}
+        for position, entity in enumerate(entities):
+            columns.setdefault((entity['table'], entity['column']), []).append(position)
+        if not columns:
+            return []
+
+        def match_column(table_name, column_name, positions):
+            terms = list(dict.fromkeys(entities[position]['value'] for position in positions))
+            matches = search_terms_in_column(terms, table_name, column_name, score_cutoff=self.min_match_score)
+            return dict(zip(terms, matches))
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(columns)))) as executor:
+            futures = {
+                key: executor.submit(match_column, key[0], key[1], positions)
+                for key, positions in columns.items()
+            }
+            matches_by_column = {key: future.result() for key, future in futures.items()}
+
+        value_mappings = []
+        for entity in entities:
+            match = matches_by_column[(entity['table'], entity['column'])][entity['value']]
+            if match and match.get('score', 0) > self.min_match_score:
+                value_mappings.append({
+                    "original_value": entity['value'],
+                    "matched_value": match['matched_value'],
+                    "score": match['score']
+                })
+        return value_mappings
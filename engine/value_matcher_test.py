@@ -40,5 +40,19 @@ def main():
     except Exception as e:
         print(f"Error: {str(e)}")
 
+    # Several entities at once: each column is read once, columns are matched concurrently
+    test_entities = [
+        test_entity,
+        {"table": "poims_users", "column": "username", "value": "ramesh"},
+        {"table": "admin_users", "column": "firstname", "value": "Chathnya"}
+    ]
+    try:
+        matches = matcher.match_entities(test_entities)
+        print("\nMatched Values:")
+        for match in matches:
+            print(f"'{match['original_value']}' -> '{match['matched_value']}' ({match['score']})")
+    except Exception as e:
+        print(f"Error: {str(e)}")
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import tempfile
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from llm_config.llm_call import set_backend, generate_text, HTTPBackend
+from llm_config.llm_backends import MockBackend, RecordReplayBackend
+from engine.generator import SQLGenerator
+from engine.entity_extractor import EntityExtractor
+from engine.refiner import SQLRefiner
+from engine.analyzer import SQLAnalyzer
+
+def run_workflow(user_query, llm_model="deepseek-chat"):
+    """Run the LLM stages of the workflow and return the time spent in each"""
+    timings = {}
+
+    start = time.perf_counter()
+    generated = SQLGenerator().main_generator(user_query, llm_model=llm_model)
+    timings["generator"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    entities = EntityExtractor().main_entity_extractor(generated["generated_sql"], llm_model=llm_model)
+    timings["entity_extractor"] = time.perf_counter() - start
+
+    # Pretend every entity matched a slightly different database value
+    value_mappings = [{"original_value": e["value"], "matched_value": e["value"].title(), "score": 90} for e in entities]
+
+    start = time.perf_counter()
+    refined = SQLRefiner().main_refiner(generated["generated_sql"], value_mappings, llm_model=llm_model)
+    timings["refiner"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    analysis = SQLAnalyzer().main_analyzer(user_query, [{"district": "209", "inspections": 12}], llm_model=llm_model)
+    timings["analyzer"] = time.perf_counter() - start
+
+    print(f"  Generated SQL: {generated['generated_sql']}")
+    print(f"  Entities: {entities}")
+    print(f"  Refined SQL: {refined['refined_sql']}")
+    print(f"  Analysis: {analysis['analysis'][:60]}...")
+    print("  Timings: " + ", ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in timings.items()))
+
+def main():
+    """Test the mock and record/replay provider backends"""
+    user_query = "Show FPS inspections assigned by dayakarB."
+
+    print("\nMock backend (no latency):")
+    set_backend(MockBackend())
+    run_workflow(user_query)
+
+    print("\nMock backend (lognormal latency, median 200ms):")
+    set_backend(MockBackend(latency=("lognormal", 0.2, 0.5), seed=42))
+    run_workflow(user_query)
+
+    with tempfile.TemporaryDirectory() as recordings:
+        print("\nRecording mock responses:")
+        set_backend(RecordReplayBackend(recordings, mode="record", inner=MockBackend(latency=0.05)))
+        print(f"  {generate_text('Who are you?', model='gemini')}")
+        print(f"  Recorded files: {len(os.listdir(recordings))}")
+
+        print("\nReplaying:")
+        set_backend(RecordReplayBackend(recordings, mode="replay"))
+        start = time.perf_counter()
+        print(f"  {generate_text('Who are you?', model='gemini')} ({(time.perf_counter() - start) * 1000:.1f}ms)")
+
+    set_backend(HTTPBackend())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+class LLMResponseCache:
+    def __init__(self, db_path: Optional[str] = None, max_memory_entries: int = 256,
+                 max_disk_mb: float = 100.0, ttl_seconds: Optional[float] = 7 * 24 * 3600):
+        """
+        Two-tier cache of LLM responses keyed on (model, prompt, generation parameters).
+
+        Args:
+            db_path: Path of the sqlite file for the disk tier (None keeps the cache in memory only)
+            max_memory_entries: Maximum number of responses kept in the in-memory LRU tier
+            max_disk_mb: Maximum total size of responses stored in the disk tier
+            ttl_seconds: Seconds before a cached response expires (None never expires)
+        """
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds
+
+        self._memory = OrderedDict()  # key -> (created_at, response)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "evictions": 0}
+
+        self._conn = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt, params: Dict) -> str:
+        """Build a content-addressed key from the model, the final prompt and generation parameters."""
+        content = json.dumps({"model": model, "prompt": prompt, "params": params}, sort_keys=True)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, response = entry
+                if not self._is_expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["memory_hits"] += 1
+                    return response
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    response, created_at = row
+                    if not self._is_expired(created_at, now):
+                        self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._conn.commit()
+                        self._put_memory(key, created_at, response)
+                        self._stats["hits"] += 1
+                        self._stats["disk_hits"] += 1
+                        return response
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, response: str):
+        """Store a response in both tiers, evicting least recently used entries over the limits."""
+        now = time.time()
+        with self._lock:
+            self._put_memory(key, now, response)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, response, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, response, len(response.encode("utf-8")), now, now)
+                )
+                self._evict_disk()
+                self._conn.commit()
+
+    def _put_memory(self, key: str, created_at: float, response: str):
+        self._memory[key] = (created_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _evict_disk(self):
+        total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total_size <= self.max_disk_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed_at").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total_size <= self.max_disk_bytes:
+                break
+            evicted.append((key,))
+            total_size -= size
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", evicted)
+        self._stats["evictions"] += len(evicted)
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and current tier sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_entries"] = 0
+            if self._conn is not None:
+                stats["disk_entries"] = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            return stats
+
+    def clear(self):
+        """Remove every cached response and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            self._stats = {name: 0 for name in self._stats}
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_cache")
+                self._conn.commit()
+
+    def close(self):
+        """Close the disk tier connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
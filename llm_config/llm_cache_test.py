@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+import tempfile
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from llm_config.llm_cache import LLMResponseCache
+from llm_config.llm_call import generate_text, enable_cache, disable_cache, get_cache_stats
+
+def _check_cache_tiers(db_path):
+    """Test memory and disk tiers, TTL and eviction"""
+    cache = LLMResponseCache(db_path, max_memory_entries=2, max_disk_mb=0.001, ttl_seconds=1)
+    params = {"temperature": 0.1}
+
+    keys = [LLMResponseCache.make_key("deepseek-chat", f"prompt {i}", params) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.set(key, f"response {i} " + "x" * 300)
+
+    print("\nCache tiers:")
+    print(f"  Memory hit: {cache.get(keys[2]) is not None}")
+    print(f"  Disk hit (evicted from memory): {cache.get(keys[0]) is not None}")
+    time.sleep(1.1)
+    print(f"  Hit after TTL: {cache.get(keys[2]) is not None}")
+    print(f"  Stats: {cache.stats()}")
+    cache.close()
+
+def _check_generate_text_cache(db_path):
+    """Test the response cache through generate_text"""
+    enable_cache(db_path)
+    prompt = "Who are you?"
+    model = "deepseek-chat"
+
+    print("\ngenerate_text cache:")
+    for attempt in range(2):
+        start = time.perf_counter()
+        response = generate_text(prompt, model=model)
+        print(f"  Attempt {attempt + 1}: {time.perf_counter() - start:.3f}s - {response[:60]}")
+    print(f"  Stats: {get_cache_stats()}")
+    disable_cache()
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _check_cache_tiers(os.path.join(tmp_dir, "tiers.sqlite"))
+        _check_generate_text_cache(os.path.join(tmp_dir, "llm_cache.sqlite"))
+
+if __name__ == "__main__":
+    main()
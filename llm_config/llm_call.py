@@ -1,6 +1,25 @@
 import os
-import requests
+import sys
 import json
+import asyncio
+import itertools
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterator, List
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from llm_config.llm_client import get_client
+from llm_config.llm_cache import LLMResponseCache
+from llm_config.llm_session import ConversationSession
+from llm_config.llm_tokens import count_tokens, get_stage_budget, record_usage, get_token_report, reset_token_report
+from llm_config.llm_rate_limiter import get_rate_limiter
+from llm_config.llm_backends import MockBackend, RecordReplayBackend, provider_for
+from llm_config.llm_resilience import (
+    RESILIENCE_CONFIG, LLMCallError, configure_resilience, error_from_response, call_with_retries, run_with_failover
+)
 
 # Global variables for API configurations
 HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
@@ -9,44 +28,311 @@ DEEPSEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
 GEMINI_API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={GEMINI_API_KEY}"
+GEMINI_STREAM_API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:streamGenerateContent?alt=sse&key={GEMINI_API_KEY}"
+
+# Generation parameters shared by every provider (also part of the response cache key)
+GENERATION_PARAMS = {
+    "temperature": 0.1,
+    "top_p": 0.95,
+    "max_tokens": 512
+}
+
+# Opt-in response cache (enabled with enable_cache() or the LLM_CACHE_PATH environment variable)
+response_cache = None
+
+# Shared session for callers that want the old chat-style behaviour (pass session=default_session)
+default_session = ConversationSession()
+
+def generate_text(prompt: str, model: str = "mistralai/Mistral-7B-Instruct-v0.3", session: ConversationSession = None,
+                  priority: str = "interactive", stage: str = None):
+    """
+    Generate text using either Hugging Face, DeepSeek, or Gemini model.
+    
+    Args:
+        prompt: Prompt to send
+        model: Model name (deepseek*, gemini* or a Hugging Face model id)
+        session: Optional ConversationSession whose bounded history is replayed before the prompt.
+                 Without a session the call is stateless and only the prompt is sent.
+        priority: Scheduling priority at the provider rate limiter ("interactive" or "batch")
+        stage: Engine stage making the call (generator, entity_extractor, refiner, analyzer),
+               used for the per-stage token report and budget check
+    
+    Retryable provider errors are retried with backoff, then the fallback models of
+    RESILIENCE_CONFIG are tried in order (optionally hedged after hedge_after seconds).
+    Answers from a fallback or hedge model are returned but not cached.
+    
+    Raises:
+        LLMCallError: If every model failed
+    """
+    messages = session.build_messages(prompt) if session is not None else [{"role": "user", "content": prompt}]
+    final_prompt = _render_prompt(messages)
+    prompt_tokens = _check_budget(final_prompt, stage)
+    
+    # Serve identical requests from the cache when enabled
+    cache = response_cache
+    if cache is not None:
+        cache_key = LLMResponseCache.make_key(model, messages, GENERATION_PARAMS)
+        generated_text = cache.get(cache_key)
+        if generated_text is not None:
+            record_usage(stage, prompt_tokens, 0, cached=True)
+            if session is not None:
+                session.add_exchange(prompt, generated_text)
+            return generated_text
+    
+    answered_by, generated_text = run_with_failover(
+        lambda candidate: call_with_retries(lambda: _call_provider(candidate, final_prompt, messages, priority, prompt_tokens)),
+        _failover_models(model),
+        hedge_after=RESILIENCE_CONFIG["hedge_after"]
+    )
+    record_usage(stage, prompt_tokens, count_tokens(generated_text))
+    
+    # A fallback or hedge answer must not be served later as the requested model's answer
+    if cache is not None and answered_by == model:
+        cache.set(cache_key, generated_text)
+    if session is not None:
+        session.add_exchange(prompt, generated_text)
+    return generated_text
+
+def generate_many(prompts: List[str], model: str = "mistralai/Mistral-7B-Instruct-v0.3", max_workers: int = 8,
+                  priority: str = "batch", stage: str = None) -> List[Dict]:
+    """
+    Generate text for many prompts on a bounded pool of worker threads.
+    
+    Args:
+        prompts: Prompts to send (each call is stateless)
+        model: Model name used for every prompt
+        max_workers: Maximum number of prompts in flight at once
+        priority: Scheduling priority at the provider rate limiter (default: "batch")
+        stage: Engine stage making the calls (for the token report)
+    
+    Returns:
+        One dictionary per prompt, in input order, containing:
+            - text: Generated text, or None if the call failed
+            - error: Error message, or None on success
+    """
+    results = [None] * len(prompts)
+    
+    def run(index: int):
+        try:
+            results[index] = {"text": generate_text(prompts[index], model=model, priority=priority, stage=stage), "error": None}
+        except Exception as e:
+            results[index] = {"text": None, "error": str(e)}
+    
+    if prompts:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(prompts)))) as executor:
+            list(executor.map(run, range(len(prompts))))
+    return results
+
+def generate_text_stream(prompt: str, model: str = "mistralai/Mistral-7B-Instruct-v0.3", session: ConversationSession = None,
+                         priority: str = "interactive", stage: str = None) -> Iterator[str]:
+    """
+    Stream generated text chunk by chunk as the provider produces it.
+    Takes the same arguments as generate_text; the joined chunks are cached and
+    recorded in the session exactly like a blocking call.
+    Retries and failover apply until the first chunk arrives (streams are not hedged).
+    """
+    messages = session.build_messages(prompt) if session is not None else [{"role": "user", "content": prompt}]
+    final_prompt = _render_prompt(messages)
+    prompt_tokens = _check_budget(final_prompt, stage)
+    
+    # Serve identical requests from the cache when enabled
+    cache = response_cache
+    if cache is not None:
+        cache_key = LLMResponseCache.make_key(model, messages, GENERATION_PARAMS)
+        cached_text = cache.get(cache_key)
+        if cached_text is not None:
+            record_usage(stage, prompt_tokens, 0, cached=True)
+            if session is not None:
+                session.add_exchange(prompt, cached_text)
+            yield cached_text
+            return
+    
+    answered_by, stream = run_with_failover(
+        lambda candidate: call_with_retries(lambda: _start_stream(candidate, final_prompt, messages, priority, prompt_tokens)),
+        _failover_models(model)
+    )
+    
+    chunks = []
+    for chunk in stream:
+        chunks.append(chunk)
+        yield chunk
+    generated_text = "".join(chunks).strip()
+    record_usage(stage, prompt_tokens, count_tokens(generated_text))
+    
+    if cache is not None and answered_by == model:
+        cache.set(cache_key, generated_text)
+    if session is not None:
+        session.add_exchange(prompt, generated_text)
+
+async def agenerate_text_stream(prompt: str, model: str = "mistralai/Mistral-7B-Instruct-v0.3", session: ConversationSession = None,
+                                priority: str = "interactive", stage: str = None) -> AsyncIterator[str]:
+    """
+    Asynchronous version of generate_text_stream.
+    The provider stream is read in a worker thread and chunks are handed to the event loop as they arrive.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    done = object()
+    
+    def produce():
+        try:
+            for chunk in generate_text_stream(prompt, model, session, priority, stage):
+                loop.call_soon_threadsafe(queue.put_nowait, chunk)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+    
+    producer = loop.run_in_executor(None, produce)
+    while True:
+        item = await queue.get()
+        if item is done:
+            break
+        if isinstance(item, Exception):
+            raise item
+        yield item
+    await producer
 
-# Global conversation history
-conversation_history = []
-max_turns = 5  # Maximum number of conversation turns to keep in history
-
-def generate_text(prompt: str, model: str = "mistralai/Mistral-7B-Instruct-v0.3"):
-    """Generate text using either Hugging Face, DeepSeek, or Gemini model with conversation history."""
-    global conversation_history
-    
-    # Add current prompt to history
-    conversation_history.append({"role": "user", "content": prompt})
-    
-    # Prepare the context-aware prompt based on history
-    if len(conversation_history) > 1:
-        # Format the conversation history into a context string
-        context_prompt = ""
-        # Include up to max_turns previous exchanges
-        start_idx = max(0, len(conversation_history) - (max_turns * 2))
-        for i in range(start_idx, len(conversation_history)):
-            entry = conversation_history[i]
-            if entry["role"] == "user":
-                context_prompt += f"User: {entry['content']}\n"
-            else:
-                context_prompt += f"Assistant: {entry['content']}\n"
-        
-        # Add the final instruction for the model
-        final_prompt = context_prompt + "Assistant:"
+def _failover_models(model: str) -> list:
+    """Requested model first, then the configured fallback models."""
+    return [model] + [m for m in RESILIENCE_CONFIG["fallback_models"] if m != model]
+
+def _check_budget(final_prompt: str, stage: str) -> int:
+    """Count the prompt tokens and warn when the prompt exceeds the token budget of its stage."""
+    prompt_tokens = count_tokens(final_prompt)
+    budget = get_stage_budget(stage)
+    if budget is not None and prompt_tokens > budget:
+        print(f"Warning: {stage} prompt has {prompt_tokens} tokens, over its budget of {budget}")
+    return prompt_tokens
+
+def _request_tokens(prompt_tokens: int) -> int:
+    """Tokens reserved at the rate limiter: the prompt (counted once by _check_budget) plus the maximum completion."""
+    return prompt_tokens + GENERATION_PARAMS["max_tokens"]
+
+def _call_provider(model: str, final_prompt: str, messages: list, priority: str = "interactive",
+                   prompt_tokens: int = 0) -> str:
+    """Make a single blocking call to the provider serving the model, metered by its rate limiter."""
+    provider = provider_for(model)
+    with get_rate_limiter(provider).slot(priority, _request_tokens(prompt_tokens)):
+        return provider_backend.generate(model, final_prompt, messages)
+
+def _start_stream(model: str, final_prompt: str, messages: list, priority: str = "interactive",
+                  prompt_tokens: int = 0) -> Iterator[str]:
+    """
+    Open a provider stream and read its first chunk, so request errors surface
+    (and can be retried) before anything is yielded to the caller.
+    The rate limiter slot is held until the stream is exhausted or closed.
+    """
+    provider = provider_for(model)
+    limiter = get_rate_limiter(provider)
+    limiter.acquire(priority, _request_tokens(prompt_tokens))
+    try:
+        stream = provider_backend.stream(model, final_prompt, messages)
+        first_chunk = next(stream, "")
+    except BaseException:
+        limiter.release()
+        raise
+    return _release_when_done(itertools.chain([first_chunk], stream), limiter)
+
+def _release_when_done(stream: Iterator[str], limiter) -> Iterator[str]:
+    """Yield from a stream and free its rate limiter slot afterwards."""
+    try:
+        yield from stream
+    finally:
+        limiter.release()
+
+class HTTPBackend:
+    """Provider backend sending real requests to the Hugging Face, DeepSeek and Gemini APIs."""
+    
+    def generate(self, model: str, final_prompt: str, messages: list) -> str:
+        # Check which model to use
+        provider = provider_for(model)
+        if provider == "deepseek":
+            return _call_deepseek_api(final_prompt, model, messages)
+        elif provider == "gemini":
+            return _call_gemini_api(final_prompt, model)
+        else:
+            return _call_huggingface_api(final_prompt, model)
+    
+    def stream(self, model: str, final_prompt: str, messages: list) -> Iterator[str]:
+        provider = provider_for(model)
+        if provider == "deepseek":
+            return _stream_deepseek_api(final_prompt, model, messages)
+        elif provider == "gemini":
+            return _stream_gemini_api(final_prompt, model)
+        else:
+            return _stream_huggingface_api(final_prompt, model)
+
+def set_backend(backend):
+    """
+    Replace the provider backend used by every call (HTTPBackend, MockBackend, RecordReplayBackend
+    or any object with generate() and stream() methods).
+    """
+    global provider_backend
+    provider_backend = backend
+
+def use_backend(name: str, **settings):
+    """
+    Switch the provider backend by name.
+    
+    Args:
+        name: "http", "mock", "record" or "replay"
+        settings: Backend arguments (MockBackend settings for "mock", path for "record"/"replay")
+    """
+    if name == "http":
+        backend = HTTPBackend()
+    elif name == "mock":
+        backend = MockBackend(**settings)
+    elif name in ("record", "replay"):
+        backend = RecordReplayBackend(settings.pop("path"), mode=name, inner=HTTPBackend() if name == "record" else None)
     else:
+        raise ValueError(f"Unknown LLM backend: {name}")
+    set_backend(backend)
+    return backend
+
+def _post(provider: str, url: str, headers: dict, payload: dict, stream: bool = False):
+    """
+    POST through the pooled provider client.
+    Raises LLMCallError on timeouts, connection errors and non-200 responses.
+    """
+    try:
+        response = get_client(provider).post(url, headers=headers, json=payload, stream=stream)
+    except requests.RequestException as e:
+        raise LLMCallError(f"{provider} API request failed: {str(e)}", provider=provider, retryable=True)
+    
+    if response.status_code != 200:
+        error = error_from_response(response, provider)
+        response.close()
+        raise error
+    return response
+
+def _render_prompt(messages: list) -> str:
+    """Flatten chat messages into a single User/Assistant prompt for completion-style APIs."""
+    if len(messages) == 1:
         # For the first message, just use the prompt as is
-        final_prompt = f"User: {prompt}\nAssistant:"
+        return f"User: {messages[0]['content']}\nAssistant:"
     
-    # Check which model to use
-    if "deepseek" in model.lower():
-        return _call_deepseek_api(final_prompt, model)
-    elif "gemini" in model.lower():
-        return _call_gemini_api(final_prompt, model)
-    else:
-        return _call_huggingface_api(final_prompt, model)
+    # Format the conversation history into a context string
+    context_prompt = ""
+    for entry in messages:
+        if entry["role"] == "user":
+            context_prompt += f"User: {entry['content']}\n"
+        else:
+            context_prompt += f"Assistant: {entry['content']}\n"
+    
+    # Add the final instruction for the model
+    return context_prompt + "Assistant:"
+
+async def agenerate_text(prompt: str, model: str = "mistralai/Mistral-7B-Instruct-v0.3", session: ConversationSession = None,
+                         priority: str = "interactive", stage: str = None):
+    """
+    Asynchronous version of generate_text.
+    Not asyncio-native I/O: the blocking provider call runs on the event loop's default
+    thread pool (asyncio.to_thread), which bounds how many calls are in flight at once.
+    Several models can still be awaited concurrently (e.g. with asyncio.gather) and
+    share the pooled provider clients.
+    """
+    return await asyncio.to_thread(generate_text, prompt, model, session, priority, stage)
 
 def _call_huggingface_api(prompt: str, model: str):
     """Make API call to Hugging Face models."""
@@ -64,69 +350,50 @@ def _call_huggingface_api(prompt: str, model: str):
     payload = {
         "inputs": formatted_prompt,
         "parameters": {
-            "max_new_tokens": 512,
-            "temperature": 0.1,
-            "top_p": 0.95,
+            "max_new_tokens": GENERATION_PARAMS["max_tokens"],
+            "temperature": GENERATION_PARAMS["temperature"],
+            "top_p": GENERATION_PARAMS["top_p"],
             "do_sample": False,
             "return_full_text": False
         }
     }
     
-    response = requests.post(f"{huggingface_api_url}{model}", headers=headers, json=payload)
+    response = _post("huggingface", f"{huggingface_api_url}{model}", headers, payload)
     
-    if response.status_code == 200:
-        try:
-            response_json = response.json()
-            if isinstance(response_json, list) and len(response_json) > 0:
-                generated_text = response_json[0].get("generated_text", "").strip()
-                if "Assistant:" in generated_text:
-                    generated_text = generated_text.split("Assistant:", 1)[1].strip()
-                _update_conversation_history(generated_text)
-                return generated_text
-            return "Error: Unexpected API response format"
-        except json.JSONDecodeError:
-            return "Error: Invalid JSON response from API"
-    else:
-        error_msg = f"Error: {response.status_code} - {response.text}"
-        print(error_msg)
-        return error_msg
+    try:
+        response_json = response.json()
+    except json.JSONDecodeError:
+        raise LLMCallError("huggingface API error: Invalid JSON response from API", provider="huggingface")
+    
+    if isinstance(response_json, list) and len(response_json) > 0:
+        generated_text = response_json[0].get("generated_text", "").strip()
+        if "Assistant:" in generated_text:
+            generated_text = generated_text.split("Assistant:", 1)[1].strip()
+        return generated_text
+    raise LLMCallError("huggingface API error: Unexpected API response format", provider="huggingface")
 
-def _call_deepseek_api(prompt: str, model: str):
+def _call_deepseek_api(prompt: str, model: str, messages: list):
     """Make API call to DeepSeek models."""
     headers = {
         "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
         "Content-Type": "application/json"
     }
     
-    # Format messages for DeepSeek API
-    messages = []
-    for entry in conversation_history:
-        messages.append({
-            "role": entry["role"],
-            "content": entry["content"]
-        })
-    
     payload = {
         "model": model,
         "messages": messages,
-        "temperature": 0.1,
-        "max_tokens": 512
+        "temperature": GENERATION_PARAMS["temperature"],
+        "max_tokens": GENERATION_PARAMS["max_tokens"]
     }
     
-    response = requests.post(DEEPSEEK_API_URL, headers=headers, json=payload)
+    response = _post("deepseek", DEEPSEEK_API_URL, headers, payload)
     
-    if response.status_code == 200:
-        try:
-            response_json = response.json()
-            generated_text = response_json.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-            _update_conversation_history(generated_text)
-            return generated_text
-        except (json.JSONDecodeError, KeyError, IndexError):
-            return "Error: Invalid API response format"
-    else:
-        error_msg = f"Error: {response.status_code} - {response.text}"
-        print(error_msg)
-        return error_msg
+    try:
+        response_json = response.json()
+        generated_text = response_json.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+        return generated_text
+    except (json.JSONDecodeError, KeyError, IndexError):
+        raise LLMCallError("deepseek API error: Invalid API response format", provider="deepseek")
 
 def _call_gemini_api(prompt: str, model: str):
     """Make API call to Gemini models using REST API."""
@@ -142,41 +409,151 @@ def _call_gemini_api(prompt: str, model: str):
             }]
         }],
         "generationConfig": {
-            "temperature": 0.1,
-            "topP": 0.95,
-            "maxOutputTokens": 512
+            "temperature": GENERATION_PARAMS["temperature"],
+            "topP": GENERATION_PARAMS["top_p"],
+            "maxOutputTokens": GENERATION_PARAMS["max_tokens"]
         }
     }
     
+    response = _post("gemini", GEMINI_API_URL, headers, payload)
+    
     try:
-        response = requests.post(GEMINI_API_URL, headers=headers, json=payload)
-        
-        if response.status_code == 200:
-            response_json = response.json()
-            generated_text = response_json.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "").strip()
-            _update_conversation_history(generated_text)
-            return generated_text
-        else:
-            error_msg = f"Error: {response.status_code} - {response.text}"
-            print(error_msg)
-            return error_msg
-            
-    except Exception as e:
-        error_msg = f"Error calling Gemini API: {str(e)}"
-        print(error_msg)
-        return error_msg
-
-def _update_conversation_history(generated_text: str):
-    """Update conversation history with the generated response."""
-    global conversation_history
-    conversation_history.append({"role": "assistant", "content": generated_text})
-    
-    # Trim history if needed
-    if len(conversation_history) > max_turns * 2:
-        conversation_history = conversation_history[-(max_turns * 2):]
+        response_json = response.json()
+        generated_text = response_json.get("candidates", [{}])[0].get("content", {}).get("parts", [{}])[0].get("text", "").strip()
+        return generated_text
+    except (json.JSONDecodeError, KeyError, IndexError, AttributeError):
+        raise LLMCallError("gemini API error: Invalid API response format", provider="gemini")
+
+def _iter_sse_events(response, provider: str) -> Iterator[dict]:
+    """Yield the JSON payload of each server-sent event in a streaming response."""
+    try:
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            try:
+                yield json.loads(data)
+            except json.JSONDecodeError:
+                continue
+    except requests.RequestException as e:
+        raise LLMCallError(f"{provider} stream interrupted: {str(e)}", provider=provider)
+
+def _stream_huggingface_api(prompt: str, model: str) -> Iterator[str]:
+    """Stream tokens from Hugging Face models."""
+    headers = {
+        "Authorization": f"Bearer {HUGGINGFACE_API_KEY}",
+        "Content-Type": "application/json"
+    }
+    
+    # Format prompt based on model type
+    if "mistral" in model.lower():
+        formatted_prompt = f"<s>[INST] {prompt} [/INST]"
+    else:
+        formatted_prompt = prompt
+    
+    payload = {
+        "inputs": formatted_prompt,
+        "parameters": {
+            "max_new_tokens": GENERATION_PARAMS["max_tokens"],
+            "temperature": GENERATION_PARAMS["temperature"],
+            "top_p": GENERATION_PARAMS["top_p"],
+            "do_sample": False,
+            "return_full_text": False
+        },
+        "stream": True
+    }
+    
+    with _post("huggingface", f"{huggingface_api_url}{model}", headers, payload, stream=True) as response:
+        for event in _iter_sse_events(response, "huggingface"):
+            token = event.get("token", {})
+            if token.get("text") and not token.get("special", False):
+                yield token["text"]
+
+def _stream_deepseek_api(prompt: str, model: str, messages: list) -> Iterator[str]:
+    """Stream tokens from DeepSeek models."""
+    headers = {
+        "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
+        "Content-Type": "application/json"
+    }
+    
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": GENERATION_PARAMS["temperature"],
+        "max_tokens": GENERATION_PARAMS["max_tokens"],
+        "stream": True
+    }
+    
+    with _post("deepseek", DEEPSEEK_API_URL, headers, payload, stream=True) as response:
+        for event in _iter_sse_events(response, "deepseek"):
+            content = (event.get("choices") or [{}])[0].get("delta", {}).get("content")
+            if content:
+                yield content
+
+def _stream_gemini_api(prompt: str, model: str) -> Iterator[str]:
+    """Stream tokens from Gemini models using the SSE REST endpoint."""
+    headers = {
+        "Content-Type": "application/json"
+    }
+    
+    payload = {
+        "contents": [{
+            "parts": [{
+                "text": prompt
+            }]
+        }],
+        "generationConfig": {
+            "temperature": GENERATION_PARAMS["temperature"],
+            "topP": GENERATION_PARAMS["top_p"],
+            "maxOutputTokens": GENERATION_PARAMS["max_tokens"]
+        }
+    }
+    
+    with _post("gemini", GEMINI_STREAM_API_URL, headers, payload, stream=True) as response:
+        for event in _iter_sse_events(response, "gemini"):
+            parts = (event.get("candidates") or [{}])[0].get("content", {}).get("parts", [])
+            for part in parts:
+                if part.get("text"):
+                    yield part["text"]
 
 def reset_conversation():
-    """Reset the conversation history."""
-    global conversation_history
-    conversation_history = []
-    return True
\ No newline at end of file
+    """Reset the history of the default session."""
+    default_session.reset()
+    return True
+
+def enable_cache(db_path: str = None, **settings) -> LLMResponseCache:
+    """
+    Enable the LLM response cache for every generate_text call.
+    
+    Args:
+        db_path: Path of the sqlite file for the disk tier (None keeps the cache in memory only)
+        settings: Any of max_memory_entries, max_disk_mb, ttl_seconds
+    """
+    global response_cache
+    disable_cache()
+    response_cache = LLMResponseCache(db_path, **settings)
+    return response_cache
+
+def disable_cache():
+    """Disable the LLM response cache."""
+    global response_cache
+    if response_cache is not None:
+        response_cache.close()
+        response_cache = None
+
+def get_cache_stats():
+    """Return hit/miss counters of the response cache, or None when disabled."""
+    return response_cache.stats() if response_cache is not None else None
+
+if os.getenv("LLM_CACHE_PATH"):
+    enable_cache(os.getenv("LLM_CACHE_PATH"))
+
+# Provider backend used by every call (switch with set_backend/use_backend or LLM_BACKEND)
+provider_backend = HTTPBackend()
+_backend_name = os.getenv("LLM_BACKEND", "http")
+if _backend_name in ("record", "replay"):
+    use_backend(_backend_name, path=os.getenv("LLM_REPLAY_PATH", "llm_recordings"))
+elif _backend_name != "http":
+    use_backend(_backend_name)
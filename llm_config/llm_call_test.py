@@ -1,16 +1,23 @@
-from llm_call import generate_text, reset_conversation  # Import the functions
+from llm_call import generate_text
+from llm_session import ConversationSession
 
 # Start with a fresh conversation
-reset_conversation()
+session = ConversationSession(max_turns=5, max_history_tokens=2000)
 
 # First prompt
 prompt1 = "Who are you?"
-response1 = generate_text(prompt1, model="mistralai/Mistral-7B-Instruct-v0.3")
+response1 = generate_text(prompt1, model="mistralai/Mistral-7B-Instruct-v0.3", session=session)
 print("Generated Response 1:")
 print(response1)
 
-# Follow-up prompt without needing to include previous context (handled by conversation history)
+# Follow-up prompt without needing to include previous context (handled by the session history)
 prompt2 = "Tell me a joke."
-response2 = generate_text(prompt2, model="mistralai/Mistral-7B-Instruct-v0.3")
+response2 = generate_text(prompt2, model="mistralai/Mistral-7B-Instruct-v0.3", session=session)
 print("\nGenerated Response 2:")
-print(response2)
\ No newline at end of file
+print(response2)
+
+# Calls without a session are stateless and only send the prompt
+prompt3 = "What was our last chat about?"
+response3 = generate_text(prompt3, model="mistralai/Mistral-7B-Instruct-v0.3")
+print("\nGenerated Response 3 (stateless):")
+print(response3)
@@ -0,0 +1,93 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+# Default connection settings shared by every provider client
+DEFAULT_CLIENT_CONFIG = {
+    "pool_size": int(os.getenv("LLM_POOL_SIZE", "10")),
+    "connect_timeout": float(os.getenv("LLM_CONNECT_TIMEOUT", "5")),
+    "read_timeout": float(os.getenv("LLM_READ_TIMEOUT", "120")),
+    "keep_alive": True
+}
+
+# Per-provider overrides of the default connection settings
+PROVIDER_CLIENT_CONFIG = {
+    "huggingface": {},
+    "deepseek": {},
+    "gemini": {}
+}
+
+# One pooled client per provider, created on first use
+_clients = {}
+_clients_lock = threading.Lock()
+
+class ProviderClient:
+    def __init__(self, provider: str, pool_size: int = 10, connect_timeout: float = 5.0,
+                 read_timeout: float = 120.0, keep_alive: bool = True):
+        """
+        Pooled HTTP client for a single LLM provider.
+
+        Args:
+            provider: Provider name (huggingface, deepseek, gemini)
+            pool_size: Maximum number of connections kept open to the provider
+            connect_timeout: Seconds to wait for the TCP/TLS connection
+            read_timeout: Seconds to wait for the response
+            keep_alive: Reuse connections between calls instead of closing them
+        """
+        self.provider = provider
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.keep_alive = keep_alive
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Connection"] = "keep-alive" if keep_alive else "close"
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request through the pooled session using the client timeouts."""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.post(url, **kwargs)
+
+    def close(self):
+        """Close every pooled connection of this client."""
+        self.session.close()
+
+def get_client(provider: str) -> ProviderClient:
+    """Return the pooled client for a provider, creating it on first use."""
+    with _clients_lock:
+        client = _clients.get(provider)
+        if client is None:
+            settings = dict(DEFAULT_CLIENT_CONFIG)
+            settings.update(PROVIDER_CLIENT_CONFIG.get(provider, {}))
+            client = ProviderClient(provider, **settings)
+            _clients[provider] = client
+        return client
+
+def configure_client(provider: str, **settings):
+    """
+    Override connection settings for a provider.
+    The existing client (if any) is closed and rebuilt on the next call.
+
+    Args:
+        provider: Provider name (huggingface, deepseek, gemini)
+        settings: Any of pool_size, connect_timeout, read_timeout, keep_alive
+    """
+    unknown = set(settings) - set(DEFAULT_CLIENT_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown client settings: {', '.join(sorted(unknown))}")
+    with _clients_lock:
+        PROVIDER_CLIENT_CONFIG.setdefault(provider, {}).update(settings)
+        client = _clients.pop(provider, None)
+    if client is not None:
+        client.close()
+
+def close_clients():
+    """Close all provider clients and their pooled connections."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
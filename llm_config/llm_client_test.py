@@ -0,0 +1,64 @@
+import os
+import sys
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from llm_config import llm_call
+from llm_config.llm_client import configure_client, close_clients
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the DeepSeek chat completions endpoint."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        StandInHandler.connections += 1
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length))
+        prompt = payload["messages"][-1]["content"]
+        body = json.dumps({"choices": [{"message": {"content": f"echo: {prompt}"}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    """Test pooled provider clients against a local HTTP stand-in"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    llm_call.DEEPSEEK_API_URL = f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+
+    num_calls = 20
+    for keep_alive in (False, True):
+        configure_client("deepseek", keep_alive=keep_alive, pool_size=4, connect_timeout=2, read_timeout=10)
+        StandInHandler.connections = 0
+
+        start = time.perf_counter()
+        for i in range(num_calls):
+            response = llm_call.generate_text(f"ping {i}", model="deepseek-chat")
+        elapsed = time.perf_counter() - start
+
+        print(f"\nkeep_alive={keep_alive}")
+        print(f"  Last response: {response}")
+        print(f"  Calls: {num_calls}, connections opened: {StandInHandler.connections}")
+        print(f"  Average latency: {elapsed / num_calls * 1000:.2f} ms")
+
+    close_clients()
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import time
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Union
+
+# Request priorities, lower values are served first
+PRIORITIES = {
+    "interactive": 0,
+    "batch": 10
+}
+
+# Per-provider limits (None means unlimited)
+RATE_LIMIT_CONFIG = {
+    "huggingface": {"requests_per_second": None, "max_concurrent": None, "tokens_per_minute": None},
+    "deepseek": {"requests_per_second": None, "max_concurrent": None, "tokens_per_minute": None},
+    "gemini": {"requests_per_second": None, "max_concurrent": None, "tokens_per_minute": None}
+}
+
+# One limiter per provider, created on first use
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+class ProviderRateLimiter:
+    def __init__(self, provider: str, requests_per_second: Optional[float] = None,
+                 max_concurrent: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        """
+        Token-bucket limiter for one provider with a priority queue in front of it.
+        Waiting requests are admitted strictly by priority, then in arrival order.
+
+        Args:
+            provider: Provider name (huggingface, deepseek, gemini)
+            requests_per_second: Sustained request rate (bursts up to one second's worth)
+            max_concurrent: Maximum number of requests in flight
+            tokens_per_minute: Sustained token rate (prompt + completion budget per request)
+        """
+        self.provider = provider
+        self.requests_per_second = requests_per_second
+        self.max_concurrent = max_concurrent
+        self.tokens_per_minute = tokens_per_minute
+
+        self._request_capacity = max(1.0, requests_per_second) if requests_per_second else None
+        self._request_bucket = self._request_capacity
+        self._token_bucket = float(tokens_per_minute) if tokens_per_minute else None
+        self._last_refill = time.monotonic()
+        self._in_flight = 0
+
+        self._waiters = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._metrics = {"admitted": 0, "total_wait": 0.0, "max_wait": 0.0, "by_priority": {}}
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        if self._request_bucket is not None:
+            self._request_bucket = min(self._request_capacity, self._request_bucket + elapsed * self.requests_per_second)
+        if self._token_bucket is not None:
+            self._token_bucket = min(float(self.tokens_per_minute), self._token_bucket + elapsed * self.tokens_per_minute / 60.0)
+
+    def _seconds_until_available(self, tokens: int) -> float:
+        """0 when a request can go now, else the time until the buckets refill enough."""
+        wait_time = 0.0
+        if self._request_bucket is not None and self._request_bucket < 1:
+            wait_time = max(wait_time, (1 - self._request_bucket) / self.requests_per_second)
+        if self._token_bucket is not None and self._token_bucket < tokens:
+            wait_time = max(wait_time, (tokens - self._token_bucket) * 60.0 / self.tokens_per_minute)
+        return wait_time
+
+    def acquire(self, priority: Union[str, int] = "interactive", tokens: int = 0) -> float:
+        """
+        Block until the request may be sent.
+
+        Args:
+            priority: Priority name from PRIORITIES or an integer (lower is served first)
+            tokens: Tokens the request is expected to consume
+
+        Returns:
+            Seconds spent waiting
+        """
+        if isinstance(priority, str):
+            if priority not in PRIORITIES:
+                raise ValueError(f"Unknown priority: {priority}")
+            priority_value = PRIORITIES[priority]
+        else:
+            priority_value = priority
+        if self.tokens_per_minute:
+            tokens = min(tokens, self.tokens_per_minute)
+
+        start = time.monotonic()
+        with self._condition:
+            entry = (priority_value, next(self._sequence))
+            heapq.heappush(self._waiters, entry)
+            while True:
+                timeout = None
+                if self._waiters[0] == entry:
+                    self._refill(time.monotonic())
+                    wait_time = self._seconds_until_available(tokens)
+                    has_slot = self.max_concurrent is None or self._in_flight < self.max_concurrent
+                    if wait_time == 0 and has_slot:
+                        break
+                    # Sleep until the buckets refill; a release() wakes us for a free slot
+                    timeout = wait_time if has_slot else None
+                self._condition.wait(timeout)
+
+            heapq.heappop(self._waiters)
+            if self._request_bucket is not None:
+                self._request_bucket -= 1
+            if self._token_bucket is not None:
+                self._token_bucket -= tokens
+            self._in_flight += 1
+
+            waited = time.monotonic() - start
+            self._metrics["admitted"] += 1
+            self._metrics["total_wait"] += waited
+            self._metrics["max_wait"] = max(self._metrics["max_wait"], waited)
+            by_priority = self._metrics["by_priority"].setdefault(str(priority), {"admitted": 0, "total_wait": 0.0})
+            by_priority["admitted"] += 1
+            by_priority["total_wait"] += waited
+
+            # Let the next waiter check whether it can go as well
+            self._condition.notify_all()
+        return waited
+
+    def release(self):
+        """Mark a request as finished, freeing its concurrency slot."""
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, priority: Union[str, int] = "interactive", tokens: int = 0):
+        """Context manager holding a slot for the duration of a request."""
+        self.acquire(priority, tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def metrics(self) -> Dict:
+        """Return queue depth, in-flight requests and wait-time statistics."""
+        with self._condition:
+            admitted = self._metrics["admitted"]
+            return {
+                "queue_depth": len(self._waiters),
+                "in_flight": self._in_flight,
+                "admitted": admitted,
+                "avg_wait": self._metrics["total_wait"] / admitted if admitted else 0.0,
+                "max_wait": self._metrics["max_wait"],
+                "by_priority": {
+                    name: {
+                        "admitted": stats["admitted"],
+                        "avg_wait": stats["total_wait"] / stats["admitted"]
+                    }
+                    for name, stats in self._metrics["by_priority"].items()
+                }
+            }
+
+def get_rate_limiter(provider: str) -> ProviderRateLimiter:
+    """Return the limiter for a provider, creating it on first use."""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = ProviderRateLimiter(provider, **RATE_LIMIT_CONFIG.get(provider, {}))
+            _limiters[provider] = limiter
+        return limiter
+
+def configure_rate_limit(provider: str, **limits):
+    """
+    Override the limits of a provider. The new limiter applies to requests queued after the call.
+
+    Args:
+        provider: Provider name (huggingface, deepseek, gemini)
+        limits: Any of requests_per_second, max_concurrent, tokens_per_minute
+    """
+    unknown = set(limits) - {"requests_per_second", "max_concurrent", "tokens_per_minute"}
+    if unknown:
+        raise ValueError(f"Unknown rate limit settings: {', '.join(sorted(unknown))}")
+    with _limiters_lock:
+        RATE_LIMIT_CONFIG.setdefault(provider, {}).update(limits)
+        _limiters.pop(provider, None)
+
+def get_rate_limit_metrics() -> Dict[str, Dict]:
+    """Return the metrics of every provider limiter in use."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {provider: limiter.metrics() for provider, limiter in limiters.items()}
@@ -0,0 +1,38 @@
+import time
+import threading
+from llm_rate_limiter import ProviderRateLimiter
+
+def simulated_request(limiter, name, priority, results, duration=0.05):
+    """Hold a limiter slot for a fake provider call"""
+    waited = limiter.acquire(priority, tokens=100)
+    try:
+        time.sleep(duration)
+        results.append((name, waited))
+    finally:
+        limiter.release()
+
+def main():
+    """Test token buckets, concurrency limit and priority scheduling"""
+    limiter = ProviderRateLimiter("deepseek", requests_per_second=20, max_concurrent=2, tokens_per_minute=60000)
+    results = []
+
+    # Queue a burst of batch requests, then an interactive one behind them
+    threads = [threading.Thread(target=simulated_request, args=(limiter, f"batch-{i}", "batch", results)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.01)
+    print(f"\nQueue depth while the batch is waiting: {limiter.metrics()['queue_depth']}")
+
+    interactive = threading.Thread(target=simulated_request, args=(limiter, "interactive", "interactive", results))
+    interactive.start()
+    for thread in threads + [interactive]:
+        thread.join()
+
+    print("\nCompletion order:")
+    for name, waited in results:
+        print(f"  {name:<12} waited {waited * 1000:.0f} ms")
+
+    print(f"\nMetrics: {limiter.metrics()}")
+
+if __name__ == "__main__":
+    main()
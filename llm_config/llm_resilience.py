@@ -0,0 +1,159 @@
+import time
+import random
+import threading
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from typing import Callable, List, Optional
+
+# Retry, hedging and failover settings used by generate_text
+RESILIENCE_CONFIG = {
+    "max_retries": 2,        # Retries per model on 429/5xx, timeouts and connection errors
+    "backoff_base": 0.5,     # Seconds, doubled on every retry
+    "backoff_max": 8.0,      # Upper bound of a single backoff delay
+    "hedge_after": None,     # Seconds before a hedged request is sent to the next model (None disables hedging)
+    "fallback_models": []    # Models tried in order after the requested one fails, e.g. ["deepseek-chat", "gemini"]
+}
+
+class LLMCallError(Exception):
+    def __init__(self, message: str, provider: str = None, status_code: int = None,
+                 retryable: bool = False, retry_after: float = None):
+        """
+        Error raised when an LLM provider call fails.
+
+        Args:
+            message: Error description
+            provider: Provider that failed (huggingface, deepseek, gemini)
+            status_code: HTTP status code, if the provider answered
+            retryable: Whether the same request may succeed when retried
+            retry_after: Seconds the provider asked us to wait (Retry-After header)
+        """
+        super().__init__(message)
+        self.provider = provider
+        self.status_code = status_code
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+def configure_resilience(**settings):
+    """
+    Override retry, hedging and failover settings.
+    
+    Args:
+        settings: Any of max_retries, backoff_base, backoff_max, hedge_after, fallback_models
+    """
+    unknown = set(settings) - set(RESILIENCE_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown resilience settings: {', '.join(sorted(unknown))}")
+    RESILIENCE_CONFIG.update(settings)
+
+def is_retryable_status(status_code: int) -> bool:
+    """Rate limits and server errors are worth retrying, other client errors are not."""
+    return status_code == 429 or 500 <= status_code < 600
+
+def error_from_response(response, provider: str) -> LLMCallError:
+    """Build an LLMCallError from a non-200 provider response."""
+    retry_after = response.headers.get("Retry-After")
+    try:
+        retry_after = float(retry_after) if retry_after else None
+    except ValueError:
+        retry_after = None
+    return LLMCallError(
+        f"{provider} API error: {response.status_code} - {response.text}",
+        provider=provider,
+        status_code=response.status_code,
+        retryable=is_retryable_status(response.status_code),
+        retry_after=retry_after
+    )
+
+def backoff_delay(attempt: int, backoff_base: float, backoff_max: float) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (0-based)."""
+    return random.uniform(0, min(backoff_max, backoff_base * (2 ** attempt)))
+
+def call_with_retries(call: Callable, max_retries: int = None, backoff_base: float = None, backoff_max: float = None):
+    """
+    Run call() and retry retryable LLMCallErrors with exponential backoff and jitter.
+    A Retry-After value sent by the provider takes precedence over the computed delay.
+    """
+    max_retries = RESILIENCE_CONFIG["max_retries"] if max_retries is None else max_retries
+    backoff_base = RESILIENCE_CONFIG["backoff_base"] if backoff_base is None else backoff_base
+    backoff_max = RESILIENCE_CONFIG["backoff_max"] if backoff_max is None else backoff_max
+
+    for attempt in range(max_retries + 1):
+        try:
+            return call()
+        except LLMCallError as e:
+            if not e.retryable or attempt == max_retries:
+                raise
+            delay = e.retry_after if e.retry_after is not None else backoff_delay(attempt, backoff_base, backoff_max)
+            print(f"Retrying {e.provider} in {delay:.2f}s after error: {e}")
+            time.sleep(delay)
+
+def run_with_failover(call: Callable[[str], object], models: List[str], hedge_after: Optional[float] = None):
+    """
+    Call models in failover order until one succeeds.
+
+    Args:
+        call: Function taking a model name and returning its result (raises LLMCallError on failure)
+        models: Models in failover order, the requested model first
+        hedge_after: If set, the second model is started when the first has not answered after
+                     this many seconds, and the first successful answer wins
+
+    Returns:
+        (model, result) of the first successful call, so callers know which model answered
+    """
+    errors = []
+    remaining = list(models)
+
+    if hedge_after is not None and len(remaining) > 1:
+        primary, hedge = remaining[0], remaining[1]
+        remaining = remaining[2:]
+        try:
+            return _call_hedged(call, primary, hedge, hedge_after)
+        except LLMCallError as e:
+            errors.append(e)
+
+    for model in remaining:
+        try:
+            return model, call(model)
+        except LLMCallError as e:
+            errors.append(e)
+            if model != models[-1]:
+                print(f"Model {model} failed, failing over: {e}")
+
+    if len(errors) == 1:
+        raise errors[0]
+    raise LLMCallError("All models failed: " + "; ".join(str(e) for e in errors))
+
+def _start_call(call: Callable[[str], object], model: str) -> Future:
+    """
+    Run call(model) on a thread of its own and return a future of (model, result).
+    A shared pool would queue requests under load while the hedge_after timer is already running.
+    """
+    future = Future()
+    def run():
+        try:
+            future.set_result((model, call(model)))
+        except BaseException as e:
+            future.set_exception(e)
+    threading.Thread(target=run, name=f"llm-hedge-{model}", daemon=True).start()
+    return future
+
+def _call_hedged(call: Callable[[str], object], primary: str, hedge: str, hedge_after: float):
+    """Run the primary model and start the hedge model if the primary is slower than hedge_after."""
+    futures = [_start_call(call, primary)]
+    done, _ = wait(futures, timeout=hedge_after)
+    if not done or futures[0].exception() is not None:
+        futures.append(_start_call(call, hedge))
+
+    errors = []
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            error = future.exception()
+            if error is None:
+                # The slower request keeps running in the background; its result is discarded
+                return future.result()
+            if not isinstance(error, LLMCallError):
+                raise error
+            errors.append(error)
+
+    raise LLMCallError("Hedged requests failed: " + "; ".join(str(e) for e in errors))
@@ -0,0 +1,46 @@
+import time
+from llm_resilience import LLMCallError, call_with_retries, run_with_failover
+
+def flaky_call(failures: int):
+    """Return a call that fails with a retryable 503 the first `failures` times"""
+    state = {"calls": 0}
+    def call():
+        state["calls"] += 1
+        if state["calls"] <= failures:
+            raise LLMCallError("deepseek API error: 503 - Service Unavailable", provider="deepseek",
+                               status_code=503, retryable=True)
+        return f"answer after {state['calls']} calls"
+    return call
+
+def model_call(model: str):
+    """Simulated models: deepseek is slow, mistral is down, gemini is fast"""
+    if model == "deepseek-chat":
+        time.sleep(1.0)
+        return "deepseek answer"
+    if model == "mistralai/Mistral-7B-Instruct-v0.3":
+        raise LLMCallError("huggingface API error: 500 - Internal Server Error", provider="huggingface", status_code=500)
+    time.sleep(0.1)
+    return "gemini answer"
+
+def main():
+    """Test retries, failover and hedged requests"""
+    print("\nRetries with backoff:")
+    print(f"  {call_with_retries(flaky_call(2), max_retries=3, backoff_base=0.05)}")
+
+    print("\nFailover:")
+    model, result = run_with_failover(model_call, ['mistralai/Mistral-7B-Instruct-v0.3', 'gemini'])
+    print(f"  {result} (from {model})")
+
+    print("\nHedged request:")
+    start = time.perf_counter()
+    model, result = run_with_failover(model_call, ["deepseek-chat", "gemini"], hedge_after=0.2)
+    print(f"  {result} (from {model}) in {time.perf_counter() - start:.2f}s")
+
+    print("\nAll models failing:")
+    try:
+        run_with_failover(model_call, ["mistralai/Mistral-7B-Instruct-v0.3"])
+    except LLMCallError as e:
+        print(f"  LLMCallError: {e} (status {e.status_code})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import threading
+from typing import Dict, List
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from llm_config.llm_tokens import count_tokens
+
+class ConversationSession:
+    def __init__(self, max_turns: int = 5, max_history_tokens: int = 2000):
+        """
+        Conversation history for one caller, bounded by turns and by tokens.
+        Pass a session to generate_text to carry context between calls; without one
+        every call is stateless.
+
+        Args:
+            max_turns: Maximum number of previous exchanges (user + assistant) replayed
+            max_history_tokens: Token budget for the replayed history (the current prompt is always sent)
+        """
+        self.max_turns = max_turns
+        self.max_history_tokens = max_history_tokens
+        self._history = []
+        self._lock = threading.Lock()
+
+    def build_messages(self, prompt: str) -> List[Dict]:
+        """
+        Return the bounded history followed by the current prompt as chat messages.
+        The oldest entries are dropped first until the history fits the token budget.
+        """
+        with self._lock:
+            history = self._history[max(0, len(self._history) - self.max_turns * 2):]
+
+        kept = []
+        used_tokens = 0
+        for entry in reversed(history):
+            entry_tokens = count_tokens(entry["content"])
+            if used_tokens + entry_tokens > self.max_history_tokens:
+                break
+            kept.append(entry)
+            used_tokens += entry_tokens
+        kept.reverse()
+
+        # Never start the replayed history with an assistant reply
+        while kept and kept[0]["role"] != "user":
+            kept.pop(0)
+
+        return kept + [{"role": "user", "content": prompt}]
+
+    def add_exchange(self, prompt: str, response: str):
+        """Record a completed prompt/response exchange."""
+        with self._lock:
+            self._history.append({"role": "user", "content": prompt})
+            self._history.append({"role": "assistant", "content": response})
+            if len(self._history) > self.max_turns * 2:
+                self._history = self._history[len(self._history) - self.max_turns * 2:]
+
+    @property
+    def history(self) -> List[Dict]:
+        """Copy of the recorded history."""
+        with self._lock:
+            return list(self._history)
+
+    def reset(self):
+        """Forget the recorded history."""
+        with self._lock:
+            self._history = []
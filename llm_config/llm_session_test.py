@@ -0,0 +1,31 @@
+import os
+import sys
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from llm_config.llm_session import ConversationSession
+from llm_config.llm_tokens import count_tokens
+
+def main():
+    """Test bounded, token-budgeted conversation history"""
+    session = ConversationSession(max_turns=2, max_history_tokens=60)
+
+    # Record a few exchanges, one of them much larger than the budget
+    session.add_exchange("Who are you?", "I am an SQL assistant.")
+    session.add_exchange("Describe the schema.", "x" * 400)
+    session.add_exchange("Tell me a joke.", "Why did the DBA leave? Too many relationships.")
+
+    print(f"\nRecorded entries: {len(session.history)}")
+
+    messages = session.build_messages("One more joke please.")
+    print("\nMessages sent with the next prompt:")
+    for message in messages:
+        print(f"  {message['role']}: {message['content'][:50]} (~{count_tokens(message['content'])} tokens)")
+
+    session.reset()
+    print(f"\nEntries after reset: {len(session.history)}")
+
+if __name__ == "__main__":
+    main()
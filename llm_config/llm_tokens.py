@@ -0,0 +1,123 @@
+import re
+import threading
+from typing import Dict, List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # Optional dependency, falls back to a regex estimate
+    tiktoken = None
+
+# Prompt token budget per engine stage (None means unlimited)
+STAGE_TOKEN_BUDGETS = {
+    "generator": 3000,
+    "entity_extractor": 2500,
+    "refiner": 1500,
+    "analyzer": 3000
+}
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_encoding = None
+_encoding_lock = threading.Lock()
+
+# Token usage per stage
+_usage = {}
+_usage_lock = threading.Lock()
+
+def _get_encoding():
+    """Load the tiktoken encoding once, or return None when tiktoken is unavailable."""
+    global _encoding, tiktoken
+    if tiktoken is None:
+        return None
+    with _encoding_lock:
+        if _encoding is None:
+            try:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                # Encoding files could not be loaded (e.g. offline), use the estimate from now on
+                tiktoken = None
+                return None
+        return _encoding
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens of a text with tiktoken (cl100k_base) when installed,
+    else estimate them from words and punctuation (about 4 characters per token for long words).
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return sum(max(1, (len(piece) + 3) // 4) for piece in _TOKEN_PATTERN.findall(text))
+
+def fit_sections(sections: List[str], max_tokens: int, separator: str = "\n") -> List[str]:
+    """Keep whole sections, in order, while they fit max_tokens."""
+    kept = []
+    used_tokens = 0
+    for section in sections:
+        section_tokens = count_tokens(section + separator)
+        if used_tokens + section_tokens > max_tokens:
+            break
+        kept.append(section)
+        used_tokens += section_tokens
+    return kept
+
+def compact_records(records: List[Dict], max_tokens: int) -> str:
+    """
+    Render result records as a compact pipe-separated table (column names once, then one line per row),
+    keeping as many rows as fit max_tokens and noting how many were left out.
+    """
+    if not records:
+        return "No results found"
+
+    columns = list(records[0].keys())
+    header = " | ".join(str(col) for col in columns)
+    lines = [header]
+    used_tokens = count_tokens(header)
+
+    for index, row in enumerate(records):
+        line = " | ".join(str(row.get(col)) for col in columns)
+        line_tokens = count_tokens(line) + 1
+        # Reserve room for the omission note
+        if used_tokens + line_tokens + 12 > max_tokens:
+            lines.append(f"... ({len(records) - index} more records not shown)")
+            break
+        lines.append(line)
+        used_tokens += line_tokens
+
+    return "\n".join(lines)
+
+def get_stage_budget(stage: Optional[str]) -> Optional[int]:
+    """Prompt token budget of a stage, or None when unlimited."""
+    return STAGE_TOKEN_BUDGETS.get(stage) if stage else None
+
+def configure_stage_budget(stage: str, max_tokens: Optional[int]):
+    """Set the prompt token budget of a stage (None for unlimited)."""
+    STAGE_TOKEN_BUDGETS[stage] = max_tokens
+
+def record_usage(stage: Optional[str], prompt_tokens: int, completion_tokens: int, cached: bool = False):
+    """Add one LLM call to the token report of its stage."""
+    with _usage_lock:
+        usage = _usage.setdefault(stage or "unassigned", {
+            "calls": 0, "cache_hits": 0, "prompt_tokens": 0, "completion_tokens": 0
+        })
+        usage["calls"] += 1
+        if cached:
+            usage["cache_hits"] += 1
+        else:
+            usage["prompt_tokens"] += prompt_tokens
+            usage["completion_tokens"] += completion_tokens
+
+def get_token_report() -> Dict[str, Dict]:
+    """Return calls and tokens sent/received per stage (cache hits cost no tokens)."""
+    with _usage_lock:
+        report = {}
+        for stage, usage in _usage.items():
+            report[stage] = dict(usage)
+            report[stage]["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        return report
+
+def reset_token_report():
+    """Clear the token report."""
+    with _usage_lock:
+        _usage.clear()
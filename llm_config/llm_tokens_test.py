@@ -0,0 +1,36 @@
+import os
+import sys
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from llm_config import llm_call
+from llm_config.llm_tokens import count_tokens, compact_records, get_token_report, reset_token_report
+from engine.analyzer import SQLAnalyzer
+from engine.entity_extractor import EntityExtractor
+
+def main():
+    """Test token counting, prompt budgets and the per-stage token report"""
+    sql_query = "SELECT name, revenue FROM companies WHERE sector = 'Energy' ORDER BY revenue DESC"
+    print(f"\nTokens in query: {count_tokens(sql_query)}")
+
+    # Compact a large result set into a small budget
+    records = [{"name": f"Company {i}", "sector": "Energy", "revenue": 1000 + i} for i in range(500)]
+    compacted = compact_records(records, 120)
+    print(f"\nCompacted records ({count_tokens(compacted)} tokens):\n{compacted}")
+
+    # Run two stages against the offline backend and report tokens per stage
+    llm_call.use_backend("mock")
+    reset_token_report()
+    EntityExtractor().main_entity_extractor(sql_query, llm_model="deepseek-chat")
+    analysis = SQLAnalyzer().main_analyzer("Top energy companies by revenue", records, llm_model="deepseek-chat")
+    print(f"\nAnalysis: {analysis['analysis']}")
+
+    print("\nToken report:")
+    for stage, usage in get_token_report().items():
+        print(f"  {stage:<18} calls={usage['calls']} prompt={usage['prompt_tokens']} "
+              f"completion={usage['completion_tokens']} total={usage['total_tokens']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+import time
+import numpy as np
+
+# Encoder used for schema and query embeddings
+EMBEDDING_BACKEND_CONFIG = {
+    "backend": os.getenv("SCHEMA_EMBEDDING_BACKEND", "torch")   # "torch"
+}
+
+# Backends are only added here once check_encoder_parity and benchmark_encoder have been run on them
+EMBEDDING_BACKENDS = ("torch",)
+
+def configure_embedding_backend(**settings):
+    """
+    Override the encoder settings. Encoders already loaded keep their backend.
+
+    Args:
+        settings: Any of backend
+    """
+    unknown = set(settings) - set(EMBEDDING_BACKEND_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown embedding backend settings: {', '.join(sorted(unknown))}")
+    backend = settings.get("backend", EMBEDDING_BACKEND_CONFIG["backend"])
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    EMBEDDING_BACKEND_CONFIG.update(settings)
+
+def load_encoder(model_name, backend=None):
+    """Load a sentence encoder with the given backend (default: EMBEDDING_BACKEND_CONFIG)."""
+    backend = backend or EMBEDDING_BACKEND_CONFIG["backend"]
+    if backend == "torch":
+        # Imported here so importing the engine does not pull in torch
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+def check_encoder_parity(model_name, backend, texts, reference_backend="torch"):
+    """
+    Compare the embeddings of a backend with the reference (PyTorch) path.
+
+    Returns:
+        Dictionary with the minimum and mean cosine similarity over the texts
+    """
+    reference = np.asarray(load_encoder(model_name, reference_backend).encode(texts), dtype=np.float32)
+    candidate = np.asarray(load_encoder(model_name, backend).encode(texts), dtype=np.float32)
+    reference /= np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate /= np.linalg.norm(candidate, axis=1, keepdims=True)
+    similarities = (reference * candidate).sum(axis=1)
+    return {"min_cosine": float(similarities.min()), "mean_cosine": float(similarities.mean())}
+
+def benchmark_encoder(model_name, backend, queries, repeats=5):
+    """Average single-query encode latency of a backend in milliseconds (after one warm-up call)."""
+    encoder = load_encoder(model_name, backend)
+    encoder.encode(queries[0])
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for query in queries:
+            encoder.encode(query)
+    return (time.perf_counter() - start) / (repeats * len(queries)) * 1000
@@ -0,0 +1,32 @@
+import os
+import sys
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from utils.embedding_backends import EMBEDDING_BACKENDS, check_encoder_parity, benchmark_encoder
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+TEST_QUERIES = [
+    "Who all have admin permissions?",
+    "List the inspections scheduled this week",
+    "Which assets have open maintenance tickets?",
+    "Show the documents uploaded by each user"
+]
+
+def main():
+    """Check embedding parity of every backend against PyTorch and benchmark query encoding"""
+    for backend in EMBEDDING_BACKENDS:
+        try:
+            parity = check_encoder_parity(MODEL_NAME, backend, TEST_QUERIES) if backend != "torch" else None
+            latency = benchmark_encoder(MODEL_NAME, backend, TEST_QUERIES)
+        except ImportError as e:
+            print(f"{backend:<11} skipped ({e})")
+            continue
+        parity_text = f"min cosine {parity['min_cosine']:.4f}, mean {parity['mean_cosine']:.4f}" if parity else "reference"
+        print(f"{backend:<11} {latency:6.2f} ms per query  ({parity_text})")
+
+if __name__ == "__main__":
+    main()
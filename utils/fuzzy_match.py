@@ -0,0 +1,56 @@
+import os
+import sys
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from typing import Dict, List
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+from utils.value_index import VALUE_INDEX_CONFIG
+
+class ColumnMatcher:
+    """
+    Distinct values of a column preprocessed once (lowercased, punctuation stripped) so a term
+    is scored against all of them with token_sort_ratio in a single native call.
+    With an n-gram index (high-cardinality columns) only the values it shortlists are scored.
+    """
+    def __init__(self, values: List[str], index=None):
+        self.values = values
+        self.index = index
+        # Indexed columns are scored on the preprocessed values kept by the index
+        self.choices = [default_process(value) for value in values] if index is None else None
+
+    def best_match(self, term: str, score_cutoff: float = 0) -> Dict:
+        """Best matching value (the first one on ties) with a score of at least score_cutoff and above 0."""
+        if self.index is not None:
+            candidates = self.index.candidates(term, VALUE_INDEX_CONFIG["max_candidates"])
+            result = process.extractOne(default_process(term), [self.index.choices[i] for i in candidates],
+                                        scorer=fuzz.token_sort_ratio, processor=None, score_cutoff=score_cutoff)
+            return self._to_match(term, result[1], self.index.values[candidates[result[2]]]) if result else {}
+        result = process.extractOne(default_process(term), self.choices, scorer=fuzz.token_sort_ratio,
+                                    processor=None, score_cutoff=score_cutoff)
+        return self._to_match(term, result[1], self.values[result[2]]) if result else {}
+
+    def best_matches(self, terms: List[str], score_cutoff: float = 0, workers: int = 1) -> List[Dict]:
+        """best_match of several terms, scored as one terms x values matrix."""
+        if self.index is not None:
+            return [self.best_match(term, score_cutoff) for term in terms]
+        if not terms or not self.choices:
+            return [{} for _ in terms]
+        scores = process.cdist([default_process(term) for term in terms], self.choices, scorer=fuzz.token_sort_ratio,
+                               processor=None, score_cutoff=score_cutoff, workers=workers)
+        best = scores.argmax(axis=1)
+        return [self._to_match(term, scores[i, best[i]], self.values[best[i]]) for i, term in enumerate(terms)]
+
+    def _to_match(self, term, score, value):
+        # Whole-number scores like fuzzywuzzy
+        score = int(round(float(score)))
+        if score <= 0:
+            return {}
+        return {
+            'search_term': term,
+            'matched_value': value,
+            'score': score
+        }
@@ -0,0 +1,152 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+
+# Query embedding cache settings (the disk tier is enabled by db_path or SCHEMA_QUERY_CACHE_PATH)
+QUERY_CACHE_CONFIG = {
+    "max_entries": 1024,
+    "db_path": os.getenv("SCHEMA_QUERY_CACHE_PATH"),
+    "max_disk_entries": 100000
+}
+
+def normalize_query(query):
+    """Cache key text: case, surrounding and repeated whitespace do not change the embedding we reuse."""
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU cache of query embeddings keyed by (model, normalized query text),
+    with an optional sqlite disk tier shared by workers and restarts.
+    """
+    def __init__(self, max_entries=1024, db_path=None, max_disk_entries=100000):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0}
+
+        self._conn = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS query_embeddings (
+                    key TEXT PRIMARY KEY,
+                    embedding BLOB NOT NULL,
+                    accessed_at REAL NOT NULL
+                )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS query_embeddings_accessed ON query_embeddings (accessed_at)")
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(model_name, query):
+        return hashlib.sha256(f"{model_name}\n{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    def get(self, model_name, query):
+        key = self.make_key(model_name, query)
+        with self._lock:
+            embedding = self._memory.get(key)
+            if embedding is not None:
+                self._memory.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["memory_hits"] += 1
+                return embedding
+
+            if self._conn is not None:
+                row = self._conn.execute("SELECT embedding FROM query_embeddings WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE query_embeddings SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                    self._conn.commit()
+                    embedding = np.frombuffer(row[0], dtype=np.float32)
+                    self._put_memory(key, embedding)
+                    self._stats["hits"] += 1
+                    self._stats["disk_hits"] += 1
+                    return embedding
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, model_name, query, embedding):
+        key = self.make_key(model_name, query)
+        embedding = np.array(embedding, dtype=np.float32)
+        # Shared between callers, so it must not be modified in place
+        embedding.setflags(write=False)
+        with self._lock:
+            self._put_memory(key, embedding)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (key, embedding, accessed_at) VALUES (?, ?, ?)",
+                    (key, embedding.tobytes(), time.time())
+                )
+                # Drop the least recently used entries beyond the disk limit
+                self._conn.execute("""
+                    DELETE FROM query_embeddings WHERE key IN (
+                        SELECT key FROM query_embeddings ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                    )""", (self.max_disk_entries,))
+                self._conn.commit()
+        return embedding
+
+    def _put_memory(self, key, embedding):
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["hit_rate"] = self._stats["hits"] / lookups if lookups else 0.0
+            if self._conn is not None:
+                stats["disk_entries"] = self._conn.execute("SELECT COUNT(*) FROM query_embeddings").fetchone()[0]
+            return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM query_embeddings")
+                self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+# Process-wide cache shared by every SchemaEmbedder, created on first use
+_query_cache = None
+_query_cache_lock = threading.Lock()
+
+def get_query_cache():
+    global _query_cache
+    with _query_cache_lock:
+        if _query_cache is None:
+            _query_cache = QueryEmbeddingCache(**QUERY_CACHE_CONFIG)
+        return _query_cache
+
+def configure_query_cache(**settings):
+    """
+    Override the query embedding cache settings; the cache is recreated on next use.
+
+    Args:
+        settings: Any of max_entries, db_path, max_disk_entries
+    """
+    global _query_cache
+    unknown = set(settings) - set(QUERY_CACHE_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown query cache settings: {', '.join(sorted(unknown))}")
+    with _query_cache_lock:
+        QUERY_CACHE_CONFIG.update(settings)
+        if _query_cache is not None:
+            _query_cache.close()
+            _query_cache = None
+
+def get_query_cache_stats():
+    return get_query_cache().stats()
@@ -0,0 +1,41 @@
+import os
+import sys
+import time
+import tempfile
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from utils.schema_embedder import SchemaEmbedder
+from utils.query_cache import configure_query_cache, get_query_cache_stats
+
+DB_SCHEMA = os.path.join(project_root, 'utils', 'db_schema_store')
+
+TEST_QUERIES = [
+    "Who all have admin permissions?",
+    "who all have   ADMIN permissions?",
+    "List the inspections scheduled this week",
+    "Who all have admin permissions?"
+]
+
+def main():
+    """Test the query embedding cache with an in-memory and a disk tier"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        configure_query_cache(db_path=os.path.join(cache_dir, 'query_embeddings.db'))
+        embedder = SchemaEmbedder()
+
+        for query in TEST_QUERIES:
+            start = time.perf_counter()
+            embedder.query_tables(query, DB_SCHEMA, k=10)
+            print(f"{(time.perf_counter() - start) * 1000:7.1f} ms  {query}")
+        print(f"\nCache stats: {get_query_cache_stats()}")
+
+        # A fresh process-wide cache (as in a new worker) is served from the disk tier
+        configure_query_cache(max_entries=1024)
+        embedder.query_tables(TEST_QUERIES[0], DB_SCHEMA, k=10)
+        print(f"After restart: {get_query_cache_stats()}")
+        configure_query_cache(db_path=None)
+
+if __name__ == "__main__":
+    main()
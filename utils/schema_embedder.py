@@ -1,15 +1,401 @@
+import os
+import sys
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
 import json
+import time
 import pickle
+import hashlib
+import threading
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-import os
+from utils.schema_index import (
+    SCHEMA_INDEX_CONFIG, ExactIndex, QuantizedMatrix, build_ivf, save_ivf, choose_index, top_k, quantize, quantization_recall
+)
+from utils.query_cache import get_query_cache
+from utils.embedding_backends import EMBEDDING_BACKEND_CONFIG, load_encoder
+
+# Version of the on-disk schema store written by create_db_schema
+SCHEMA_STORE_VERSION = 1
+STORE_METADATA_FILE = 'metadata.json'
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.ascontiguousarray(matrix / np.where(norms == 0, 1, norms))
+
+def format_column_snippet(col):
+    """Prompt text of one column: name, type and choices, e.g. "status character varying [choices: open, closed]"."""
+    snippet = f"{col.get('name')} {col.get('type', '')}".rstrip()
+    choices = col.get('choices', None)
+    if choices:
+        snippet += f" [choices: {', '.join(map(str, choices))}]"
+    return snippet
+
+def format_table_snippet(table_name, column_snippets):
+    """Prompt text of one table from its column snippets."""
+    return f"{table_name} ({', '.join(column_snippets)})"
+
+def _column_snippets(table, columns):
+    # Columns missing from the table definition are listed by name only
+    definitions = {col.get('name'): col for col in table.get('columns', [])}
+    return [format_column_snippet(definitions.get(name, {'name': name})) for name in columns]
+
+def write_schema_store(db_schema_path, table_names, columns, tables, embeddings, model_name, text_hashes=None,
+                       build_ivf_index=None, column_embeddings=None, column_text_hashes=None, precision=None):
+    """
+    Write a schema store directory: a float32 .npy matrix of L2-normalized embeddings
+    (one row per table) and a JSON metadata sidecar describing the rows.
+    text_hashes (hash of each embedded table text) let the next build skip unchanged tables.
+    column_embeddings (one row per column, tables in order) are stored as a second matrix;
+    column_text_hashes holds the matching per-table lists of column text hashes.
+    An IVF index is built next to the matrix when build_ivf_index is set (default: when
+    SCHEMA_INDEX_CONFIG asks for ivf, or in auto mode from ivf_min_tables tables on).
+    precision ("float32" or "int8", default SCHEMA_INDEX_CONFIG) sets how the
+    matrices are stored; for reduced precision the top-10 recall against float32 scoring
+    is checked and recorded in the metadata.
+    The prompt snippet of every table (and of each of its columns) is rendered here once,
+    so building a prompt is a join of stored strings.
+    The data files are written first and the sidecar is swapped in last, so readers
+    always see a complete store.
+    """
+    os.makedirs(db_schema_path, exist_ok=True)
+    matrix = _normalize_rows(np.asarray(embeddings, dtype=np.float32).reshape(len(table_names), -1))
+
+    precision = precision or SCHEMA_INDEX_CONFIG['precision']
+    build_id = f"{time.time_ns():x}"
+    matrix_file, scale_file = _save_matrix(db_schema_path, f"embeddings-{build_id}", matrix, precision)
+    recall = quantization_recall(matrix, precision)
+    if precision != 'float32':
+        print(f"{precision} schema embeddings: top-10 recall against float32 scoring {recall:.3f}")
+
+    column_matrix_file = column_scale_file = None
+    column_offsets = np.concatenate([[0], np.cumsum([len(cols) for cols in columns])]).astype(int).tolist()
+    if column_embeddings is not None:
+        column_matrix = np.asarray(column_embeddings, dtype=np.float32).reshape(column_offsets[-1], matrix.shape[1])
+        column_matrix_file, column_scale_file = _save_matrix(
+            db_schema_path, f"columns-{build_id}", _normalize_rows(column_matrix), precision)
+
+    if build_ivf_index is None:
+        build_ivf_index = SCHEMA_INDEX_CONFIG['index'] == 'ivf' or (
+            SCHEMA_INDEX_CONFIG['index'] == 'auto' and len(table_names) >= SCHEMA_INDEX_CONFIG['ivf_min_tables'])
+    ivf_file = None
+    if build_ivf_index and len(table_names):
+        ivf_file = f"ivf-{build_id}.npz"
+        save_ivf(os.path.join(db_schema_path, ivf_file), *build_ivf(matrix, SCHEMA_INDEX_CONFIG['nlist']))
+
+    column_snippets = [_column_snippets(table, cols) for table, cols in zip(tables, columns)]
+
+    metadata = {
+        'version': SCHEMA_STORE_VERSION,
+        'build_id': build_id,
+        'model': model_name,
+        'dim': int(matrix.shape[1]),
+        'count': len(table_names),
+        'normalized': True,
+        'precision': precision,
+        'quantization_recall': recall,
+        'matrix_file': matrix_file,
+        'scale_file': scale_file,
+        'ivf_file': ivf_file,
+        'column_matrix_file': column_matrix_file,
+        'column_scale_file': column_scale_file,
+        'tables': [
+            {'name': name, 'columns': cols, 'table': table, 'text_hash': text_hash,
+             'column_offset': column_offset, 'column_text_hashes': column_hashes,
+             'snippet': format_table_snippet(name, snippets), 'column_snippets': snippets}
+            for name, cols, table, snippets, text_hash, column_offset, column_hashes in zip(
+                table_names, columns, tables, column_snippets,
+                text_hashes or [None] * len(table_names),
+                column_offsets,
+                column_text_hashes or [None] * len(table_names)
+            )
+        ]
+    }
+    previous_files = _store_files(db_schema_path)
+    _write_store_metadata(db_schema_path, metadata)
+
+    # Files of older builds are no longer referenced (processes still mapping them keep their copy).
+    # The previous build is kept, so a reader that has just read the old metadata can still open its files.
+    kept_files = previous_files | {matrix_file, scale_file, column_matrix_file, column_scale_file, ivf_file}
+    for file_name in os.listdir(db_schema_path):
+        if file_name.startswith(('embeddings-', 'columns-', 'ivf-')) and file_name not in kept_files:
+            os.remove(os.path.join(db_schema_path, file_name))
+
+def _store_files(db_schema_path):
+    """Data files referenced by the current metadata of a store (empty if there is none)."""
+    try:
+        with open(os.path.join(db_schema_path, STORE_METADATA_FILE), 'r') as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return set()
+    return {metadata.get(key) for key in ('matrix_file', 'scale_file', 'column_matrix_file', 'column_scale_file', 'ivf_file')} - {None}
+
+def _save_matrix(db_schema_path, file_prefix, matrix, precision):
+    """Save a normalized matrix in the storage precision; returns (matrix file, scale file or None)."""
+    data, scales = quantize(matrix, precision)
+    matrix_file = f"{file_prefix}.npy"
+    np.save(os.path.join(db_schema_path, matrix_file), data)
+    if scales is None:
+        return matrix_file, None
+    scale_file = f"{file_prefix}-scales.npy"
+    np.save(os.path.join(db_schema_path, scale_file), scales)
+    return matrix_file, scale_file
+
+def _load_matrix(db_schema_path, matrix_file, scale_file=None):
+    """Memory-map a stored matrix; reduced-precision matrices are wrapped to score like float32."""
+    data = np.load(os.path.join(db_schema_path, matrix_file), mmap_mode='r')
+    if data.dtype == np.float32:
+        return data
+    scales = np.load(os.path.join(db_schema_path, scale_file)) if scale_file else None
+    return QuantizedMatrix(data, scales)
+
+def _write_store_metadata(db_schema_path, metadata):
+    metadata_path = os.path.join(db_schema_path, STORE_METADATA_FILE)
+    with open(f"{metadata_path}.tmp", 'w') as f:
+        json.dump(metadata, f)
+    os.replace(f"{metadata_path}.tmp", metadata_path)
+
+def build_schema_ivf(db_schema_path, nlist=None):
+    """Build (or rebuild) the IVF index of an existing schema store."""
+    metadata, matrix = load_schema_store(db_schema_path)
+    ivf_file = f"ivf-{metadata['build_id']}.npz"
+    # Cluster the dequantized rows (matrix[:] is float32 for every storage precision)
+    save_ivf(os.path.join(db_schema_path, ivf_file), *build_ivf(matrix[:], nlist or SCHEMA_INDEX_CONFIG['nlist']))
+    metadata['ivf_file'] = ivf_file
+    _write_store_metadata(db_schema_path, metadata)
+
+def load_schema_store(db_schema_path):
+    """Return the metadata of a schema store and its embedding matrix, memory-mapped read-only."""
+    with open(os.path.join(db_schema_path, STORE_METADATA_FILE), 'r') as f:
+        metadata = json.load(f)
+    if metadata.get('version') != SCHEMA_STORE_VERSION:
+        raise ValueError(f"Unsupported schema store version {metadata.get('version')} in {db_schema_path}")
+    matrix = _load_matrix(db_schema_path, metadata['matrix_file'], metadata.get('scale_file'))
+    return metadata, matrix
+
+def migrate_pickle_store(pickle_path, db_schema_path, model_name='all-MiniLM-L6-v2'):
+    """Convert a legacy db_schema.pkl into a schema store, reusing its embeddings (no model needed)."""
+    with open(pickle_path, 'rb') as f:
+        embeddings_dict = pickle.load(f)
+    table_names = list(embeddings_dict.keys())
+    # Hash the text each embedding was built from, so later builds only re-encode changed tables
+    embedder = SchemaEmbedder(model_name)
+    text_hashes = [
+        hashlib.sha256(embedder._table_to_text(embeddings_dict[name]['table']).encode('utf-8')).hexdigest()
+        for name in table_names
+    ]
+    write_schema_store(
+        db_schema_path,
+        table_names,
+        [embeddings_dict[name]['columns'] for name in table_names],
+        [embeddings_dict[name]['table'] for name in table_names],
+        [embeddings_dict[name]['embedding'] for name in table_names],
+        model_name,
+        text_hashes
+    )
+
+class SchemaIndex:
+    """
+    In-memory index of a schema store (or legacy pickle): table names, columns, prompt snippets and a contiguous
+    float32 matrix of L2-normalized table embeddings. The store matrix is memory-mapped, so worker
+    processes share one page-cached copy. The index is loaded once and reloaded when the store changes.
+    """
+    def __init__(self, db_schema_path):
+        self.db_schema_path = db_schema_path
+        self.table_names = []
+        self.columns = []
+        self.tables = []
+        self.snippets = []
+        self.column_snippets = []
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.column_matrix = None
+        self.column_offsets = []
+        self.ivf_path = None
+        self._backend = None
+        self._backend_settings = None
+        self._file_stamp = None
+        self._warned_no_columns = False
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        if os.path.isdir(self.db_schema_path):
+            stat = os.stat(os.path.join(self.db_schema_path, STORE_METADATA_FILE))
+        else:
+            stat = os.stat(self.db_schema_path)
+        file_stamp = (stat.st_mtime_ns, stat.st_size)
+        if file_stamp == self._file_stamp:
+            return
+        with self._lock:
+            if file_stamp != self._file_stamp:
+                try:
+                    self._load()
+                except FileNotFoundError:
+                    # The store was rebuilt twice while loading; its new metadata names existing files
+                    self._load()
+                self._file_stamp = file_stamp
+
+    def _load(self):
+        self._warned_no_columns = False
+        if os.path.isdir(self.db_schema_path):
+            metadata, matrix = load_schema_store(self.db_schema_path)
+            ivf_file = metadata.get('ivf_file')
+            column_matrix_file = metadata.get('column_matrix_file')
+            # Stores written before snippets were precomputed get them rendered once here
+            column_snippets = [
+                entry.get('column_snippets') or _column_snippets(entry['table'], entry['columns'])
+                for entry in metadata['tables']
+            ]
+            (self.table_names, self.columns, self.tables, self.snippets, self.column_snippets, self.matrix,
+             self.column_matrix, self.column_offsets, self.ivf_path, self._backend) = (
+                [entry['name'] for entry in metadata['tables']],
+                [entry['columns'] for entry in metadata['tables']],
+                [entry['table'] for entry in metadata['tables']],
+                [entry.get('snippet') or format_table_snippet(entry['name'], snippets)
+                 for entry, snippets in zip(metadata['tables'], column_snippets)],
+                column_snippets,
+                matrix,
+                _load_matrix(self.db_schema_path, column_matrix_file, metadata.get('column_scale_file')) if column_matrix_file else None,
+                [entry.get('column_offset') for entry in metadata['tables']],
+                os.path.join(self.db_schema_path, ivf_file) if ivf_file else None,
+                None
+            )
+            return
+
+        # Legacy pickle format
+        with open(self.db_schema_path, 'rb') as f:
+            embeddings_dict = pickle.load(f)
+        table_names = list(embeddings_dict.keys())
+        # Normalize once so cosine similarity is a single matrix-vector product per query
+        matrix = _normalize_rows(np.array([embeddings_dict[name]['embedding'] for name in table_names], dtype=np.float32))
+        column_snippets = [_column_snippets(embeddings_dict[name]['table'], embeddings_dict[name]['columns'])
+                           for name in table_names]
+        # Swap everything at once so concurrent searches never see a half-loaded index
+        (self.table_names, self.columns, self.tables, self.snippets, self.column_snippets, self.matrix,
+         self.column_matrix, self.column_offsets, self.ivf_path, self._backend) = (
+            table_names,
+            [embeddings_dict[name]['columns'] for name in table_names],
+            [embeddings_dict[name]['table'] for name in table_names],
+            [format_table_snippet(name, snippets) for name, snippets in zip(table_names, column_snippets)],
+            column_snippets,
+            matrix,
+            None,
+            [],
+            None,
+            None
+        )
+
+    def _get_backend(self):
+        """Exact or IVF search backend, re-chosen when SCHEMA_INDEX_CONFIG changes."""
+        settings = (SCHEMA_INDEX_CONFIG['index'], SCHEMA_INDEX_CONFIG['ivf_min_tables'])
+        backend = self._backend
+        if backend is None or settings != self._backend_settings:
+            with self._lock:
+                backend = choose_index(self.matrix, self.ivf_path) if self.ivf_path else ExactIndex(self.matrix)
+                self._backend, self._backend_settings = backend, settings
+        return backend
+
+    def search(self, query_embedding, k=10):
+        self.refresh()
+        table_names, columns, backend = self.table_names, self.columns, self._get_backend()
+        top_indices = backend.search(_normalize_query(query_embedding), k)
+        return [(table_names[idx], columns[idx]) for idx in top_indices]
+
+    def search_columns(self, query_embedding, k=10, columns_per_table=8):
+        """
+        Two-stage retrieval: the k most similar tables, then the columns_per_table most similar
+        columns of each (plus its id/*_id key columns for joins), in schema order.
+        Tables are returned with all columns when the store has no column embeddings.
+        """
+        selected = self._select_columns(query_embedding, k, columns_per_table)
+        table_names, columns = self.table_names, self.columns
+        return [
+            (table_names[idx], columns[idx] if kept is None else [columns[idx][i] for i in kept])
+            for idx, kept in selected
+        ]
+
+    def search_snippets(self, query_embedding, k=10, columns_per_table=None):
+        """
+        Like search (columns_per_table None) or search_columns, but returns (table_name, snippet)
+        pairs with the precomputed prompt snippet of each table and its selected columns.
+        """
+        selected = self._select_columns(query_embedding, k, columns_per_table)
+        table_names, snippets, column_snippets = self.table_names, self.snippets, self.column_snippets
+        return [
+            (table_names[idx], snippets[idx] if kept is None
+             else format_table_snippet(table_names[idx], [column_snippets[idx][i] for i in kept]))
+            for idx, kept in selected
+        ]
+
+    def _select_columns(self, query_embedding, k, columns_per_table):
+        """(table index, kept column positions or None for all columns) of the k most similar tables."""
+        self.refresh()
+        columns, backend = self.columns, self._get_backend()
+        column_matrix, column_offsets = self.column_matrix, self.column_offsets
+        query_embedding = _normalize_query(query_embedding)
+        if columns_per_table is not None and column_matrix is None and not self._warned_no_columns:
+            self._warned_no_columns = True
+            print(f"Warning: schema store {self.db_schema_path} has no column embeddings, sending every column "
+                  "(rebuild it with create_db_schema to prune columns)")
+
+        results = []
+        for idx in backend.search(query_embedding, k):
+            table_columns = columns[idx]
+            if (columns_per_table is None or column_matrix is None or column_offsets[idx] is None
+                    or len(table_columns) <= columns_per_table):
+                results.append((idx, None))
+                continue
+            start = column_offsets[idx]
+            scores = column_matrix[start:start + len(table_columns)] @ query_embedding
+            keep = set(top_k(scores, columns_per_table).tolist())
+            keep.update(i for i, name in enumerate(table_columns) if name == 'id' or str(name).endswith('_id'))
+            results.append((idx, sorted(keep)))
+        return results
+
+def _normalize_query(query_embedding):
+    query_embedding = np.asarray(query_embedding, dtype=np.float32)
+    query_norm = np.linalg.norm(query_embedding)
+    return query_embedding / query_norm if query_norm else query_embedding
+
+# Embedding models shared by every SchemaEmbedder in the process, loaded on first use
+_embedding_models = {}
+_embedding_models_lock = threading.Lock()
+
+def get_embedding_model(model_name, backend=None):
+    backend = backend or EMBEDDING_BACKEND_CONFIG['backend']
+    with _embedding_models_lock:
+        model = _embedding_models.get((model_name, backend))
+        if model is None:
+            # torch is only imported here, so importing the engine stays fast
+            model = load_encoder(model_name, backend)
+            _embedding_models[(model_name, backend)] = model
+        return model
+
+# One index per schema file, shared by every SchemaEmbedder in the process
+_schema_indexes = {}
+_schema_indexes_lock = threading.Lock()
+
+def get_schema_index(db_schema_path):
+    key = os.path.abspath(db_schema_path)
+    with _schema_indexes_lock:
+        index = _schema_indexes.get(key)
+        if index is None:
+            index = SchemaIndex(key)
+            _schema_indexes[key] = index
+        return index
 
 class SchemaEmbedder:
-    def __init__(self, model_name='all-MiniLM-L6-v2'):
-        self.model = SentenceTransformer(model_name)
+    def __init__(self, model_name='all-MiniLM-L6-v2', backend=None):
+        self.model_name = model_name
+        # Encoder backend (see EMBEDDING_BACKENDS), EMBEDDING_BACKEND_CONFIG when None
+        self.backend = backend
+
+    @property
+    def model(self):
+        return get_embedding_model(self.model_name, self.backend)
 
-    def create_db_schema(self, schema_json_path, db_schema_path):
+    def create_db_schema(self, schema_json_path, db_schema_path, batch_size=64):
         with open(schema_json_path, 'r') as f:
             schema_data = json.load(f)
         # Support both {"db_schema": [...]} and [...] at root
@@ -17,35 +403,141 @@ class SchemaEmbedder:
             schema = schema_data['db_schema']
         else:
             schema = schema_data
-        embeddings_dict = {}
+        tables = {}
         for table in schema:
-            table_text = self._table_to_text(table)
-            embedding = self.model.encode(table_text)
             # Support both 'name' and 'table_name' as table name key
             table_name = table.get('name') or table.get('table_name')
-            columns = [col.get('name') for col in table.get('columns', [])]
-            embeddings_dict[table_name] = {
-                'embedding': embedding,
-                'columns': columns,
-                'table': table
+            tables[table_name] = table
+        table_names = list(tables.keys())
+        columns = [[col.get('name') for col in tables[name].get('columns', [])] for name in table_names]
+        legacy = db_schema_path.endswith('.pkl')
+
+        # Table texts first, then one text per column (the legacy pickle has no column embeddings)
+        texts = [self._table_to_text(tables[name]) for name in table_names]
+        if not legacy:
+            texts += [self._column_to_text(name, col) for name in table_names for col in tables[name].get('columns', [])]
+        text_hashes = [hashlib.sha256(text.encode('utf-8')).hexdigest() for text in texts]
+
+        # Reuse the embeddings of texts that did not change since the last build
+        previous_embeddings = {} if legacy else self._previous_embeddings(db_schema_path)
+        embeddings = [previous_embeddings.get(text_hash) for text_hash in text_hashes]
+        changed = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if changed:
+            encoded = self.model.encode([texts[i] for i in changed], batch_size=batch_size)
+            for i, embedding in zip(changed, encoded):
+                embeddings[i] = embedding
+        print(f"Encoded {len(changed)} of {len(texts)} table and column texts ({len(texts) - len(changed)} unchanged)")
+
+        table_count = len(table_names)
+        if legacy:
+            embeddings_dict = {
+                name: {'embedding': embedding, 'columns': cols, 'table': tables[name]}
+                for name, cols, embedding in zip(table_names, columns, embeddings)
             }
-        with open(db_schema_path, 'wb') as f:
-            pickle.dump(embeddings_dict, f)
+            with open(db_schema_path, 'wb') as f:
+                pickle.dump(embeddings_dict, f)
+            return
+
+        column_text_hashes = []
+        offset = table_count
+        for cols in columns:
+            column_text_hashes.append(text_hashes[offset:offset + len(cols)])
+            offset += len(cols)
+        if not changed and self._store_up_to_date(db_schema_path, table_names, columns, tables,
+                                                  text_hashes[:table_count], column_text_hashes):
+            print("Schema store already up to date, not rewritten")
+            return
+        write_schema_store(
+            db_schema_path,
+            table_names,
+            columns,
+            [tables[name] for name in table_names],
+            embeddings[:table_count],
+            self.model_name,
+            text_hashes[:table_count],
+            column_embeddings=embeddings[table_count:],
+            column_text_hashes=column_text_hashes
+        )
+
+    def _store_up_to_date(self, db_schema_path, table_names, columns, tables, text_hashes, column_text_hashes):
+        """Whether the existing store already holds exactly these tables, embeddings and storage settings."""
+        try:
+            with open(os.path.join(db_schema_path, STORE_METADATA_FILE), 'r') as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            return False
+        wants_ivf = SCHEMA_INDEX_CONFIG['index'] == 'ivf' or (
+            SCHEMA_INDEX_CONFIG['index'] == 'auto' and len(table_names) >= SCHEMA_INDEX_CONFIG['ivf_min_tables'])
+        if (metadata.get('version') != SCHEMA_STORE_VERSION or metadata.get('model') != self.model_name
+                or metadata.get('precision', 'float32') != SCHEMA_INDEX_CONFIG['precision']
+                or not metadata.get('column_matrix_file') or (wants_ivf and not metadata.get('ivf_file'))):
+            return False
+        stored = [
+            (entry['name'], entry['columns'], entry['table'], entry.get('text_hash'),
+             entry.get('column_text_hashes'), entry.get('column_snippets'))
+            for entry in metadata['tables']
+        ]
+        expected = [
+            (name, cols, tables[name], text_hash, column_hashes, _column_snippets(tables[name], cols))
+            for name, cols, text_hash, column_hashes in zip(table_names, columns, text_hashes, column_text_hashes)
+        ]
+        return stored == expected
+
+    def _previous_embeddings(self, db_schema_path):
+        """
+        Table and column embeddings of the existing store by text hash (empty if there is none,
+        the model differs or the store is int8, whose vectors carry quantization error).
+        """
+        try:
+            metadata, matrix = load_schema_store(db_schema_path)
+            column_matrix_file = metadata.get('column_matrix_file')
+            column_matrix = _load_matrix(db_schema_path, column_matrix_file, metadata.get('column_scale_file')) if column_matrix_file else None
+        except (OSError, ValueError, KeyError):
+            return {}
+        if metadata.get('model') != self.model_name or metadata.get('precision', 'float32') != 'float32':
+            return {}
+        previous = {}
+        for i, entry in enumerate(metadata['tables']):
+            if entry.get('text_hash'):
+                previous[entry['text_hash']] = np.array(matrix[i])
+            if column_matrix is not None and entry.get('column_text_hashes'):
+                for j, column_hash in enumerate(entry['column_text_hashes']):
+                    previous[column_hash] = np.array(column_matrix[entry['column_offset'] + j])
+        return previous
 
     def query_tables(self, query, db_schema_path, k=10):
-        with open(db_schema_path, 'rb') as f:
-            embeddings_dict = pickle.load(f)
-        table_names = list(embeddings_dict.keys())
-        table_embeddings = np.array([embeddings_dict[name]['embedding'] for name in table_names])
-        query_embedding = self.model.encode(query)
-        similarities = cosine_similarity([query_embedding], table_embeddings)[0]
-        top_indices = similarities.argsort()[::-1][:k]
-        results = []
-        for idx in top_indices:
-            name = table_names[idx]
-            columns = embeddings_dict[name]['columns']
-            results.append((name, columns))
-        return results
+        index = get_schema_index(db_schema_path)
+        query_embedding = self._encode_query(query)
+        return index.search(query_embedding, k)
+
+    def query_columns(self, query, db_schema_path, k=10, columns_per_table=8):
+        """
+        Like query_tables, but each table only lists its columns_per_table columns most
+        similar to the query (plus id/*_id key columns), using the column embeddings of the store.
+        """
+        index = get_schema_index(db_schema_path)
+        query_embedding = self._encode_query(query)
+        return index.search_columns(query_embedding, k, columns_per_table)
+
+    def query_snippets(self, query, db_schema_path, k=10, columns_per_table=None):
+        """
+        (table_name, snippet) pairs of the tables most relevant to the query, with the prompt
+        snippets precomputed at build time (columns pruned as in query_columns when columns_per_table is set).
+        """
+        index = get_schema_index(db_schema_path)
+        query_embedding = self._encode_query(query)
+        return index.search_snippets(query_embedding, k, columns_per_table)
+
+    def _encode_query(self, query):
+        # Repeated questions skip the transformer forward pass
+        cache = get_query_cache()
+        backend = self.backend or EMBEDDING_BACKEND_CONFIG['backend']
+        # Other backends produce slightly different vectors, so they get their own cache entries
+        cache_name = self.model_name if backend == 'torch' else f"{self.model_name}:{backend}"
+        query_embedding = cache.get(cache_name, query)
+        if query_embedding is None:
+            query_embedding = cache.set(cache_name, query, self.model.encode(query))
+        return query_embedding
 
     def _table_to_text(self, table):
         table_name = table.get('name') or table.get('table_name')
@@ -61,9 +553,16 @@ class SchemaEmbedder:
             text += "\n"
         return text
 
+    def _column_to_text(self, table_name, col):
+        text = f"Table: {table_name}\nColumn: {col.get('name')} ({col.get('type', '')}) - {col.get('description', '')}"
+        choices = col.get('choices', None)
+        if choices:
+            text += f" Choices: {', '.join(map(str, choices))}"
+        return text
+
 if __name__ == "__main__":
     SCHEMA_JSON = os.path.join(os.path.dirname(__file__), 'db_schema.json')
-    DB_SCHEMA = os.path.join(os.path.dirname(__file__), 'db_schema.pkl')
+    DB_SCHEMA = os.path.join(os.path.dirname(__file__), 'db_schema_store')
     embedder = SchemaEmbedder()
     print(f"Creating vector database from {SCHEMA_JSON} ...")
     embedder.create_db_schema(SCHEMA_JSON, DB_SCHEMA)
@@ -1,5 +1,8 @@
 import os
 import sys
+import time
+import shutil
+import tempfile
 
 # Add the project root directory to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -9,7 +12,7 @@ from utils.schema_embedder import SchemaEmbedder
 
 # Paths relative to project root
 SCHEMA_JSON = os.path.join(project_root, 'utils', 'db_schema.json')
-DB_SCHEMA = os.path.join(project_root, 'utils', 'db_schema.pkl')
+DB_SCHEMA = os.path.join(project_root, 'utils', 'db_schema_store')
 
 # Example test queries
 TEST_QUERIES = [
@@ -17,22 +20,40 @@ TEST_QUERIES = [
 ]
 
 def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Work on a copy, so running the test never rewrites the tracked store
+        store_path = os.path.join(tmp_dir, 'db_schema_store')
+        shutil.copytree(DB_SCHEMA, store_path)
+        _check_schema_store(store_path)
+
+def _check_schema_store(db_schema_path):
     embedder = SchemaEmbedder()
-    # Create db_schema if not present
-    if not os.path.exists(DB_SCHEMA):
-        print("Creating vector database...")
-        embedder.create_db_schema(SCHEMA_JSON, DB_SCHEMA)
-        print("Vector database created.")
-    else:
-        print("Vector database already exists.")
+    # Create or update db_schema (only new or changed tables are re-encoded)
+    print("Updating vector database...")
+    embedder.create_db_schema(SCHEMA_JSON, db_schema_path)
+    print("Vector database up to date.")
 
     for query in TEST_QUERIES:
         print(f"\nQuery: {query}\n")
-        results = embedder.query_tables(query, DB_SCHEMA, k=10)
+        results = embedder.query_tables(query, db_schema_path, k=10)
         for table_name, columns in results:
             print(f"Table: {table_name}")
             for col in columns:
                 print(f"  - {col}")
 
+    # Two-stage retrieval: only the most relevant columns of each table
+    print(f"\nColumns per table for: {TEST_QUERIES[0]}\n")
+    for table_name, columns in embedder.query_columns(TEST_QUERIES[0], db_schema_path, k=10, columns_per_table=5):
+        print(f"Table: {table_name} ({', '.join(columns)})")
+
+    # Every embedder in the process shares the model loaded by the first query
+    print(f"\nModel shared between embedders: {SchemaEmbedder().model is embedder.model}")
+
+    # The schema index is loaded on the first query and reused afterwards
+    start = time.perf_counter()
+    for _ in range(20):
+        embedder.query_tables(TEST_QUERIES[0], db_schema_path, k=10)
+    print(f"\nAverage query_tables latency over 20 repeated queries: {(time.perf_counter() - start) / 20 * 1000:.1f} ms")
+
 if __name__ == "__main__":
     main()
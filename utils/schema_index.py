@@ -0,0 +1,188 @@
+import os
+import numpy as np
+
+# Retrieval backend used by SchemaIndex
+SCHEMA_INDEX_CONFIG = {
+    "index": "auto",          # "exact", "ivf", or "auto" (ivf when the store has one and is large enough)
+    "ivf_min_tables": 5000,   # create_db_schema builds an IVF index from this many tables on
+    "nlist": None,            # Number of IVF lists (default: about sqrt of the table count)
+    "nprobe": 8,              # IVF lists scanned per query
+    "precision": "float32"    # Storage of new schema stores: "float32" or "int8" (per-vector scale)
+}
+
+def configure_schema_index(**settings):
+    """
+    Override the schema retrieval settings.
+
+    Args:
+        settings: Any of index, ivf_min_tables, nlist, nprobe, precision
+    """
+    unknown = set(settings) - set(SCHEMA_INDEX_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown schema index settings: {', '.join(sorted(unknown))}")
+    SCHEMA_INDEX_CONFIG.update(settings)
+
+def top_k(scores, k):
+    """Indices of the k highest scores, best first, without sorting the whole array."""
+    if k >= len(scores):
+        return np.argsort(scores)[::-1]
+    candidates = np.argpartition(scores, len(scores) - k)[len(scores) - k:]
+    return candidates[np.argsort(scores[candidates])[::-1]]
+
+class QuantizedMatrix:
+    """
+    Read-only view of an int8 embedding matrix that scores like a float32 one.
+    Rows are multiplied back by their per-vector scale; products are computed in chunks
+    small enough to stay in cache, so only a chunk is ever converted to float32.
+    """
+    def __init__(self, data, scales=None, chunk_rows=256):
+        self.data = data
+        self.scales = scales
+        self.chunk_rows = chunk_rows
+        self.shape = data.shape
+        self.dtype = data.dtype
+
+    def __len__(self):
+        return len(self.data)
+
+    def __matmul__(self, vector):
+        scores = np.empty(len(self.data), dtype=np.float32)
+        for start in range(0, len(self.data), self.chunk_rows):
+            scores[start:start + self.chunk_rows] = self.data[start:start + self.chunk_rows].astype(np.float32) @ vector
+        return scores * self.scales if self.scales is not None else scores
+
+    def __getitem__(self, rows):
+        values = np.asarray(self.data[rows], dtype=np.float32)
+        if self.scales is None:
+            return values
+        scales = self.scales[rows]
+        return values * (scales[..., None] if np.ndim(scales) else scales)
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+def quantize(matrix, precision):
+    """
+    Convert a normalized float32 matrix to the storage precision.
+
+    Returns:
+        Tuple of (data, scales): scales holds the per-vector int8 scale, else None
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if precision == "float32":
+        return matrix, None
+    if precision == "int8":
+        scales = np.abs(matrix).max(axis=1) / 127.0 if len(matrix) else np.zeros(0, dtype=np.float32)
+        scales = np.where(scales == 0, 1, scales).astype(np.float32)
+        return np.round(matrix / scales[:, None]).astype(np.int8), scales
+    raise ValueError(f"Unknown embedding precision: {precision}")
+
+def quantization_recall(matrix, precision, k=10, sample=200, seed=0):
+    """
+    Top-k recall of scoring with the quantized matrix against float32 scoring, using
+    perturbed rows of the matrix as sample queries.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if precision == "float32" or not len(matrix):
+        return 1.0
+    quantized = QuantizedMatrix(*quantize(matrix, precision))
+    rng = np.random.default_rng(seed)
+    queries = matrix[rng.choice(len(matrix), min(sample, len(matrix)), replace=False)]
+    queries = queries + rng.normal(scale=0.5 / np.sqrt(matrix.shape[1]), size=queries.shape).astype(np.float32)
+    k = min(k, len(matrix))
+    recalls = [
+        len(set(top_k(matrix @ query, k).tolist()) & set(top_k(quantized @ query, k).tolist())) / k
+        for query in queries
+    ]
+    return float(np.mean(recalls))
+
+class ExactIndex:
+    """Brute-force cosine search over an L2-normalized matrix."""
+    def __init__(self, matrix):
+        self.matrix = matrix
+
+    def search(self, query_embedding, k=10):
+        return top_k(self.matrix @ query_embedding, k)
+
+class IVFIndex:
+    """
+    Inverted-file index: rows are clustered around centroids and a query only scores
+    the rows of its nprobe closest clusters.
+    """
+    def __init__(self, matrix, centroids, order, offsets, nprobe=None):
+        self.matrix = matrix
+        self.centroids = centroids
+        self.order = order
+        self.offsets = offsets
+        self.nprobe = nprobe
+
+    def search(self, query_embedding, k=10):
+        nprobe = self.nprobe or SCHEMA_INDEX_CONFIG["nprobe"]
+        probes = top_k(self.centroids @ query_embedding, len(self.centroids))
+        # Scan the closest lists, and more if they hold fewer than k rows
+        rows = []
+        row_count = 0
+        for probe_number, probe in enumerate(probes):
+            if probe_number >= nprobe and row_count >= k:
+                break
+            rows.append(self.order[self.offsets[probe]:self.offsets[probe + 1]])
+            row_count += len(rows[-1])
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        return rows[top_k(self.matrix[rows] @ query_embedding, k)]
+
+def build_ivf(matrix, nlist=None, iterations=10, seed=0):
+    """
+    Cluster the normalized rows with spherical k-means.
+
+    Returns:
+        Tuple of (centroids, order, offsets): rows of list i are order[offsets[i]:offsets[i + 1]]
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    count = len(matrix)
+    nlist = max(1, min(count, nlist or int(np.sqrt(count))))
+    rng = np.random.default_rng(seed)
+    centroids = matrix[rng.choice(count, nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = _assign(matrix, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, matrix)
+        sizes = np.bincount(assignments, minlength=nlist)
+        # Restart empty lists from random rows
+        empty = sizes == 0
+        sums[empty] = matrix[rng.choice(count, int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.where(norms == 0, 1, norms)
+
+    assignments = _assign(matrix, centroids)
+    order = np.argsort(assignments, kind="stable").astype(np.int64)
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=nlist))]).astype(np.int64)
+    return centroids.astype(np.float32), order, offsets
+
+def _assign(matrix, centroids, chunk_size=8192):
+    """Closest centroid of every row, computed in chunks to bound memory."""
+    return np.concatenate([
+        np.argmax(matrix[start:start + chunk_size] @ centroids.T, axis=1)
+        for start in range(0, len(matrix), chunk_size)
+    ]) if len(matrix) else np.zeros(0, dtype=np.int64)
+
+def save_ivf(path, centroids, order, offsets):
+    np.savez(path, centroids=centroids, order=order, offsets=offsets)
+
+def load_ivf(path):
+    data = np.load(path)
+    return data["centroids"], data["order"], data["offsets"]
+
+def choose_index(matrix, ivf_path=None):
+    """Index backend for a matrix according to SCHEMA_INDEX_CONFIG."""
+    mode = SCHEMA_INDEX_CONFIG["index"]
+    if mode not in ("auto", "exact", "ivf"):
+        raise ValueError(f"Unknown schema index: {mode}")
+    if mode == "exact" or not ivf_path or not os.path.exists(ivf_path):
+        if mode == "ivf":
+            print("No IVF index in the schema store, falling back to exact search")
+        return ExactIndex(matrix)
+    if mode == "auto" and len(matrix) < SCHEMA_INDEX_CONFIG["ivf_min_tables"]:
+        return ExactIndex(matrix)
+    return IVFIndex(matrix, *load_ivf(ivf_path))
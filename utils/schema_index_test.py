@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from utils.schema_embedder import write_schema_store, get_schema_index
+from utils.schema_index import configure_schema_index
+
+def main():
+    """Compare exact and IVF retrieval on a large synthetic schema"""
+    rng = np.random.default_rng(0)
+    table_count, dim = 50000, 384
+    topics = rng.normal(size=(500, dim))
+    embeddings = topics[rng.integers(0, len(topics), table_count)] + 0.5 * rng.normal(size=(table_count, dim))
+    queries = topics[rng.integers(0, len(topics), 100)] + 0.5 * rng.normal(size=(100, dim))
+
+    with tempfile.TemporaryDirectory() as store_path:
+        start = time.perf_counter()
+        write_schema_store(store_path, [f"table_{i}" for i in range(table_count)], [["id"]] * table_count,
+                           [{}] * table_count, embeddings, "synthetic", build_ivf_index=True)
+        print(f"\nBuilt store with IVF index for {table_count} tables in {time.perf_counter() - start:.1f} s")
+
+        index = get_schema_index(store_path)
+        results = {}
+        for mode in ("exact", "ivf"):
+            configure_schema_index(index=mode)
+            index.search(queries[0])
+            start = time.perf_counter()
+            results[mode] = [{name for name, _ in index.search(query, k=10)} for query in queries]
+            print(f"{mode:<6} {(time.perf_counter() - start) / len(queries) * 1000:.2f} ms per query")
+
+        recall = np.mean([len(exact & ivf) / 10 for exact, ivf in zip(results["exact"], results["ivf"])])
+        print(f"IVF recall@10 against exact search: {recall:.3f}")
+
+    # Reduced-precision stores (write_schema_store reports their recall against float32)
+    configure_schema_index(index="exact")
+    for precision in ("float32", "int8"):
+        with tempfile.TemporaryDirectory() as store_path:
+            write_schema_store(store_path, [f"table_{i}" for i in range(table_count)], [["id"]] * table_count,
+                               [{}] * table_count, embeddings, "synthetic", precision=precision)
+            index = get_schema_index(store_path)
+            index.search(queries[0])
+            start = time.perf_counter()
+            found = [{name for name, _ in index.search(query, k=10)} for query in queries]
+            recall = np.mean([len(exact & hits) / 10 for exact, hits in zip(results["exact"], found)])
+            print(f"{precision:<7} {index.matrix.nbytes / 1e6:.1f} MB, "
+                  f"{(time.perf_counter() - start) / len(queries) * 1000:.2f} ms per query, recall@10 {recall:.3f}")
+    configure_schema_index(index="auto")
+    _check_column_pruning(rng, dim)
+
+def _check_column_pruning(rng, dim, table_count=100, column_count=30, columns_per_table=5):
+    """Column embeddings in the store cut each table down to its most relevant columns"""
+    table_embeddings = rng.normal(size=(table_count, dim))
+    column_embeddings = rng.normal(size=(table_count * column_count, dim))
+    columns = [["id"] + [f"col_{j}" for j in range(1, column_count)] for _ in range(table_count)]
+    tables = [{"name": f"table_{i}", "columns": [{"name": name, "type": "text"} for name in cols]}
+              for i, cols in enumerate(columns)]
+
+    with tempfile.TemporaryDirectory() as store_path:
+        write_schema_store(store_path, [f"table_{i}" for i in range(table_count)], columns, tables,
+                           table_embeddings, "synthetic", column_embeddings=column_embeddings)
+        index = get_schema_index(store_path)
+        results = index.search_columns(table_embeddings[0], k=5, columns_per_table=columns_per_table)
+        snippets = index.search_snippets(table_embeddings[0], k=5, columns_per_table=columns_per_table)
+        kept = sum(len(cols) for _, cols in results)
+        print(f"\nColumn pruning: kept {kept} of {5 * column_count} columns of the top 5 tables "
+              f"(columns_per_table={columns_per_table}, plus id columns)")
+        print(f"Pruned snippet: {snippets[0][1]}")
+        assert all(len(cols) <= columns_per_table + 1 for _, cols in results)
+
+    # Without column embeddings every column is sent, with a warning on the first search
+    with tempfile.TemporaryDirectory() as store_path:
+        write_schema_store(store_path, [f"table_{i}" for i in range(table_count)], columns, tables,
+                           table_embeddings, "synthetic")
+        results = get_schema_index(store_path).search_columns(table_embeddings[0], k=5, columns_per_table=columns_per_table)
+        print(f"Without column embeddings: kept {sum(len(cols) for _, cols in results)} of {5 * column_count} columns")
+
+if __name__ == "__main__":
+    main()
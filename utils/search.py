@@ -1,41 +1,155 @@
-from utils.db_config import execute_query_with_columns
-from typing import Dict
-from fuzzywuzzy import fuzz
+import os
+from sqlalchemy import text
+from utils.db_config import engine, execute_query_with_columns, is_valid_table_name
+from utils.value_cache import get_value_cache
+from utils.value_index import VALUE_INDEX_CONFIG, get_value_index
+from utils.fuzzy_match import ColumnMatcher
+from typing import Dict, List, Tuple
 
-def search_term_in_column(term: str, table_name: str, column_name: str) -> Dict:
+# Where value matching runs
+SEARCH_CONFIG = {
+    "backend": os.getenv("SEARCH_VALUE_BACKEND", "local"),  # "local" (cached values) or "pg_trgm" (PostgreSQL similarity)
+    "trgm_candidates": 50,                                   # Most similar values returned by PostgreSQL for rescoring
+    "trgm_threshold": 0.1                                    # pg_trgm.similarity_threshold of the % filter (PostgreSQL default 0.3)
+}
+
+def configure_search(**settings):
+    """
+    Override the value matching settings.
+
+    Args:
+        settings: Any of backend, trgm_candidates, trgm_threshold
+    """
+    unknown = set(settings) - set(SEARCH_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown search settings: {', '.join(sorted(unknown))}")
+    if settings.get("backend", SEARCH_CONFIG["backend"]) not in ("local", "pg_trgm"):
+        raise ValueError(f"Unknown search backend: {settings['backend']}")
+    SEARCH_CONFIG.update(settings)
+
+def fetch_distinct_values(table_name: str, column_name: str) -> List:
+    """Read the distinct values of a column from the database."""
+    query = f"SELECT DISTINCT {column_name} FROM {table_name}"
+    columns, rows = execute_query_with_columns(query)
+    return [row[0] for row in rows]
+
+# Whether the database has the pg_trgm extension (checked on first use)
+_pg_trgm_available = None
+
+def pg_trgm_available() -> bool:
+    global _pg_trgm_available
+    if _pg_trgm_available is None:
+        try:
+            columns, rows = execute_query_with_columns("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        except Exception as e:
+            # Not remembered, so the check runs again once the database is reachable
+            print(f"Could not check for the pg_trgm extension, matching values locally: {e}")
+            return False
+        _pg_trgm_available = bool(rows)
+        if not _pg_trgm_available:
+            print("pg_trgm extension not available, matching values locally")
+    return _pg_trgm_available
+
+def fetch_trgm_candidates(term: str, table_name: str, column_name: str, limit: int = 50, threshold: float = None) -> List:
+    """
+    Distinct values of a column most similar to the term by trigram similarity, computed in
+    PostgreSQL: the % operator can use a GIN trigram index, so only the top limit values are
+    sent back. Its pg_trgm.similarity_threshold is set to threshold (default SEARCH_CONFIG
+    trgm_threshold) for this transaction only, low enough to keep the values token_sort_ratio accepts.
+    """
+    threshold = SEARCH_CONFIG["trgm_threshold"] if threshold is None else threshold
+    query = f"""SELECT value, similarity(value, :term) AS similarity
+FROM (SELECT DISTINCT {column_name}::text AS value FROM {table_name} WHERE {column_name}::text % :term) AS matches
+ORDER BY similarity DESC
+LIMIT :limit"""
+    with engine.connect() as connection:
+        # Equivalent of SET LOCAL, undone when the connection rolls back on close
+        connection.execute(text("SELECT set_config('pg_trgm.similarity_threshold', :threshold, true)"),
+                           {"threshold": str(threshold)})
+        rows = connection.execute(text(query), {"term": term, "limit": limit}).fetchall()
+    return [row[0] for row in rows]
+
+def create_trgm_indexes(columns: List[Tuple[str, str]], database_url: str = None):
+    """
+    Create the pg_trgm extension and a GIN trigram index on each (table, column), as used by
+    the pg_trgm backend. Needs a user allowed to create them: the application engine is
+    read-only, so a separate connection to database_url (default: the configured database) is used.
+    """
+    from sqlalchemy import create_engine, text
+    from utils.db_config import DATABASE_URL
+
+    admin_engine = create_engine(database_url or DATABASE_URL, isolation_level="AUTOCOMMIT")
+    try:
+        with admin_engine.connect() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for table_name, column_name in columns:
+                if not is_valid_table_name(table_name) or not is_valid_table_name(column_name):
+                    raise ValueError(f"Invalid table or column name: {table_name}.{column_name}")
+                index_name = f"{table_name}_{column_name}_trgm_idx".replace(".", "_")
+                # CONCURRENTLY keeps the table writable while the index builds
+                connection.execute(text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} "
+                    f"ON {table_name} USING gin (({column_name}::text) gin_trgm_ops)"
+                ))
+                print(f"Trigram index {index_name} ready")
+    finally:
+        admin_engine.dispose()
+    global _pg_trgm_available
+    _pg_trgm_available = None
+
+def search_term_in_column(term: str, table_name: str, column_name: str, score_cutoff: float = 0) -> Dict:
     """
     Find the best match for the term in the specified column of the table.
+    The distinct values of the column come from the process-wide value cache, so the
+    database is only queried on a cache miss or after the cached values expired.
+    With the pg_trgm backend PostgreSQL returns the most similar values instead, which are
+    rescored here; the column is only read in full when the extension is absent.
     Args:
         term: The term to search for
         table_name: The name of the table to search in
         column_name: The name of the column to search in
+        score_cutoff: Minimum score of a match (lets the scorer skip weaker values early)
     Returns:
         Dictionary containing the search term, matched value and score, or empty dict if no match found
     """
+    if SEARCH_CONFIG["backend"] == "pg_trgm" and pg_trgm_available():
+        try:
+            candidates = fetch_trgm_candidates(term, table_name, column_name, SEARCH_CONFIG["trgm_candidates"])
+        except Exception as e:
+            # Table or column does not exist, or query failed
+            return {}
+        return ColumnMatcher(candidates).best_match(term, score_cutoff)
+
+    matcher = get_column_matcher(table_name, column_name)
+    return matcher.best_match(term, score_cutoff) if matcher else {}
+
+def search_terms_in_column(terms: List[str], table_name: str, column_name: str, score_cutoff: float = 0) -> List[Dict]:
+    """
+    search_term_in_column for several terms of the same column: the column is read once
+    and all terms are scored against it in one batch.
+    Returns:
+        One match dictionary (or empty dict) per term, in input order
+    """
+    if SEARCH_CONFIG["backend"] == "pg_trgm" and pg_trgm_available():
+        return [search_term_in_column(term, table_name, column_name, score_cutoff) for term in terms]
+
+    matcher = get_column_matcher(table_name, column_name)
+    return matcher.best_matches(terms, score_cutoff) if matcher else [{} for _ in terms]
+
+def _build_matcher(table_name: str, column_name: str, values: List[str]) -> ColumnMatcher:
+    # High-cardinality columns shortlist candidates with their persistent n-gram index
+    if len(values) >= VALUE_INDEX_CONFIG["min_values"]:
+        return ColumnMatcher(values, get_value_index(table_name, column_name, values))
+    return ColumnMatcher(values)
+
+def get_column_matcher(table_name: str, column_name: str):
+    """ColumnMatcher of the cached distinct values of a column, or None if the column cannot be read."""
     # Validate table and column exist by attempting to query
     try:
-        query = f"SELECT DISTINCT {column_name} FROM {table_name}"
-        columns, rows = execute_query_with_columns(query)
-        if not rows:
-            return {}
-        distinct_values = [row[0] for row in rows]
+        return get_value_cache().get_derived(
+            table_name, column_name, fetch_distinct_values, 'matcher',
+            lambda values: _build_matcher(table_name, column_name, values)
+        )
     except Exception as e:
         # Table or column does not exist, or query failed
-        return {}
-
-    best_match = None
-    best_score = 0
-    for value in distinct_values:
-        if value is None:
-            continue
-        if not isinstance(value, str):
-            value = str(value)
-        score = fuzz.token_sort_ratio(term.lower(), value.lower())
-        if score > best_score:
-            best_score = score
-            best_match = {
-                'search_term': term,
-                'matched_value': value,
-                'score': score
-            }
-    return best_match if best_match else {}
\ No newline at end of file
+        return None
@@ -5,7 +5,7 @@ import sys
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
-from utils.search import search_term_in_column
+from utils.search import search_term_in_column, configure_search, pg_trgm_available
 
 def main():
     # Test parameters
@@ -22,5 +22,14 @@ def main():
     print(f"  Matched value: '{match['matched_value']}'")
     print(f"  Match score: {match['score']}")
 
+    # Same search pushed down to PostgreSQL (create the indexes once with create_trgm_indexes)
+    if pg_trgm_available():
+        configure_search(backend="pg_trgm")
+        match = search_term_in_column(term, table_name, column_name)
+        print(f"\npg_trgm Search Results:")
+        print(f"  Matched value: '{match.get('matched_value')}'")
+        print(f"  Match score: {match.get('score')}")
+        configure_search(backend="local")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# Distinct column value cache settings (the snapshot is enabled by db_path or SEARCH_VALUE_CACHE_PATH)
+VALUE_CACHE_CONFIG = {
+    "ttl_seconds": float(os.getenv("SEARCH_VALUE_CACHE_TTL", "3600")),
+    "max_columns": 256,
+    "max_values": 2000000,        # Total values kept in memory over all columns
+    "background_refresh": False,  # Serve expired values while they are reloaded in a background thread
+    "db_path": os.getenv("SEARCH_VALUE_CACHE_PATH")
+}
+
+class ColumnValueCache:
+    """
+    Cache of the distinct (stringified) values of database columns keyed by (table, column),
+    with TTL expiry, LRU eviction by column count and total value count, and an optional
+    sqlite snapshot that survives restarts and is shared by workers.
+    Values are loaded with the loader passed to get(), only on a miss or after expiry.
+    """
+    def __init__(self, ttl_seconds=3600, max_columns=256, max_values=2000000, background_refresh=False, db_path=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_columns = max_columns
+        self.max_values = max_values
+        self.background_refresh = background_refresh
+        self.db_path = db_path
+        self._memory = OrderedDict()
+        self._value_count = 0
+        self._lock = threading.Lock()
+        self._loading = {}
+        self._derived = {}
+        self._building = {}
+        self._stats = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "stale_hits": 0, "loads": 0}
+
+        self._conn = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS column_values (
+                    table_name TEXT NOT NULL,
+                    column_name TEXT NOT NULL,
+                    column_values TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (table_name, column_name)
+                )""")
+            self._conn.commit()
+
+    def get(self, table_name, column_name, loader):
+        """
+        Distinct values of the column, calling loader(table_name, column_name) on a miss or after expiry.
+        Loader errors propagate and nothing is cached for the column.
+        """
+        key = (table_name, column_name)
+        with self._lock:
+            entry, tier = self._memory.get(key), "memory_hits"
+            if entry is not None:
+                self._memory.move_to_end(key)
+            elif self._conn is not None:
+                entry, tier = self._read_snapshot(key), "disk_hits"
+                if entry is not None:
+                    self._put_memory(key, entry)
+
+            if entry is not None:
+                values, fetched_at = entry
+                if time.time() - fetched_at < self.ttl_seconds:
+                    self._stats["hits"] += 1
+                    self._stats[tier] += 1
+                    return values
+                if self.background_refresh:
+                    # Stale values are still a good match list while the fresh ones load
+                    self._stats["stale_hits"] += 1
+                    if key not in self._loading:
+                        self._loading[key] = threading.Event()
+                        threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+                    return values
+            self._stats["misses"] += 1
+
+            # Only one caller loads a column, the others wait for its result
+            loading = self._loading.get(key)
+            if loading is None:
+                self._loading[key] = threading.Event()
+
+        if loading is not None:
+            loading.wait()
+            with self._lock:
+                entry = self._memory.get(key)
+            if entry is not None and time.time() - entry[1] < self.ttl_seconds:
+                return entry[0]
+        return self._load(key, loader)
+
+    def get_derived(self, table_name, column_name, loader, name, build):
+        """
+        Object built once from the cached values of a column with build(values), such as
+        preprocessed match choices; rebuilt when the values are reloaded, dropped with them.
+        Only one caller builds it, the others wait for its result.
+        """
+        values = self.get(table_name, column_name, loader)
+        derived_key = (table_name, column_name, name)
+        while True:
+            with self._lock:
+                derived = self._derived.get(derived_key)
+                if derived is not None and derived[0] is values:
+                    return derived[1]
+                building = self._building.get(derived_key)
+                if building is None:
+                    building = self._building[derived_key] = threading.Event()
+                    break
+            # Built from the same values by then, unless they were reloaded or the build failed
+            building.wait()
+
+        try:
+            built = build(values)
+            with self._lock:
+                entry = self._memory.get((table_name, column_name))
+                if entry is not None and entry[0] is values:
+                    self._derived[derived_key] = (values, built)
+            return built
+        finally:
+            with self._lock:
+                self._building.pop(derived_key, None)
+            building.set()
+
+    def _drop_derived(self, key):
+        for derived_key in [derived_key for derived_key in self._derived if derived_key[:2] == key]:
+            del self._derived[derived_key]
+
+    def _refresh(self, key, loader):
+        try:
+            self._load(key, loader)
+        except Exception as e:
+            print(f"Background refresh of {key[0]}.{key[1]} failed: {e}")
+
+    def _load(self, key, loader):
+        try:
+            values = [value if isinstance(value, str) else str(value)
+                      for value in loader(*key) if value is not None]
+            fetched_at = time.time()
+            with self._lock:
+                self._stats["loads"] += 1
+                self._put_memory(key, (values, fetched_at))
+                if self._conn is not None:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO column_values (table_name, column_name, column_values, fetched_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (key[0], key[1], json.dumps(values), fetched_at)
+                    )
+                    self._conn.commit()
+            return values
+        finally:
+            with self._lock:
+                loading = self._loading.pop(key, None)
+            if loading is not None:
+                loading.set()
+
+    def _read_snapshot(self, key):
+        row = self._conn.execute(
+            "SELECT column_values, fetched_at FROM column_values WHERE table_name = ? AND column_name = ?", key
+        ).fetchone()
+        return (json.loads(row[0]), row[1]) if row is not None else None
+
+    def _put_memory(self, key, entry):
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._value_count -= len(previous[0])
+            self._drop_derived(key)
+        self._memory[key] = entry
+        self._value_count += len(entry[0])
+        # Drop the least recently used columns beyond the limits (the newest one is always kept)
+        while len(self._memory) > 1 and (len(self._memory) > self.max_columns or self._value_count > self.max_values):
+            evicted, (values, _) = self._memory.popitem(last=False)
+            self._value_count -= len(values)
+            self._drop_derived(evicted)
+
+    def invalidate(self, table_name=None, column_name=None):
+        """Forget the cached values of a column, of every column of a table, or of everything."""
+        with self._lock:
+            for key in list(self._memory):
+                if (table_name is None or key[0] == table_name) and (column_name is None or key[1] == column_name):
+                    values, _ = self._memory.pop(key)
+                    self._value_count -= len(values)
+                    self._drop_derived(key)
+            if self._conn is not None:
+                self._conn.execute(
+                    "DELETE FROM column_values WHERE (? IS NULL OR table_name = ?) AND (? IS NULL OR column_name = ?)",
+                    (table_name, table_name, column_name, column_name)
+                )
+                self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["stale_hits"] + self._stats["misses"]
+            stats = dict(self._stats)
+            stats["memory_columns"] = len(self._memory)
+            stats["memory_values"] = self._value_count
+            stats["hit_rate"] = (self._stats["hits"] + self._stats["stale_hits"]) / lookups if lookups else 0.0
+            if self._conn is not None:
+                stats["disk_columns"] = self._conn.execute("SELECT COUNT(*) FROM column_values").fetchone()[0]
+            return stats
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+# Process-wide cache used by search_term_in_column, created on first use
+_value_cache = None
+_value_cache_lock = threading.Lock()
+
+def get_value_cache():
+    global _value_cache
+    with _value_cache_lock:
+        if _value_cache is None:
+            _value_cache = ColumnValueCache(**VALUE_CACHE_CONFIG)
+        return _value_cache
+
+def configure_value_cache(**settings):
+    """
+    Override the column value cache settings; the cache is recreated on next use.
+
+    Args:
+        settings: Any of ttl_seconds, max_columns, max_values, background_refresh, db_path
+    """
+    global _value_cache
+    unknown = set(settings) - set(VALUE_CACHE_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown value cache settings: {', '.join(sorted(unknown))}")
+    with _value_cache_lock:
+        VALUE_CACHE_CONFIG.update(settings)
+        if _value_cache is not None:
+            _value_cache.close()
+            _value_cache = None
+
+def get_value_cache_stats():
+    return get_value_cache().stats()
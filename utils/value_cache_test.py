@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+import tempfile
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from utils.search import search_term_in_column
+from utils.value_cache import configure_value_cache, get_value_cache_stats
+
+TEST_SEARCHES = [
+    ("Chathnya", "admin_users", "firstname"),
+    ("chaitanya", "admin_users", "firstname"),
+    ("admin", "admin_users", "username"),
+    ("Chathnya", "admin_users", "firstname")
+]
+
+def main():
+    """Test the distinct value cache in front of search_term_in_column"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        configure_value_cache(db_path=os.path.join(cache_dir, 'column_values.db'))
+
+        for term, table_name, column_name in TEST_SEARCHES:
+            start = time.perf_counter()
+            match = search_term_in_column(term, table_name, column_name)
+            print(f"{(time.perf_counter() - start) * 1000:7.1f} ms  {table_name}.{column_name} '{term}' -> {match}")
+        print(f"\nCache stats: {get_value_cache_stats()}")
+
+        # A fresh process-wide cache (as in a new worker) is served from the snapshot
+        configure_value_cache(max_columns=256)
+        search_term_in_column(*TEST_SEARCHES[0])
+        print(f"After restart: {get_value_cache_stats()}")
+
+        # Expired values are served while a background thread reloads them
+        configure_value_cache(ttl_seconds=0, background_refresh=True)
+        search_term_in_column(*TEST_SEARCHES[0])
+        time.sleep(1)
+        print(f"Background refresh: {get_value_cache_stats()}")
+        configure_value_cache(ttl_seconds=3600, background_refresh=False, db_path=None)
+
+if __name__ == "__main__":
+    main()
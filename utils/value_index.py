@@ -0,0 +1,181 @@
+import os
+import sys
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+import re
+import json
+import tempfile
+import numpy as np
+from rapidfuzz.utils import default_process
+from utils.schema_index import top_k
+
+# Candidate index used for value matching on high-cardinality columns
+VALUE_INDEX_CONFIG = {
+    "min_values": 50000,            # Columns with this many distinct values or more are matched through an index
+    "index_dir": os.getenv("SEARCH_VALUE_INDEX_DIR",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), "value_indexes")),
+    "ngram": 3,
+    "max_candidates": 200,          # Shortlisted values rescored with token_sort_ratio per term
+    "max_posting_fraction": 0.05,   # N-grams found in more values than this are skipped when rarer ones exist
+    "max_deleted_fraction": 0.25    # A saved index with more deleted values than this is rebuilt from the live ones
+}
+
+def configure_value_index(**settings):
+    """
+    Override the value index settings. Indexes already built keep their n-gram size.
+
+    Args:
+        settings: Any of min_values, index_dir, ngram, max_candidates, max_posting_fraction, max_deleted_fraction
+    """
+    unknown = set(settings) - set(VALUE_INDEX_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown value index settings: {', '.join(sorted(unknown))}")
+    VALUE_INDEX_CONFIG.update(settings)
+
+def _ngrams(text, n):
+    # N-grams of each padded token, so the word order does not matter (like token_sort_ratio)
+    grams = set()
+    for token in text.split():
+        padded = f" {token} "
+        grams.update(padded[i:i + n] for i in range(max(1, len(padded) - n + 1)))
+    return grams
+
+class NGramIndex:
+    """
+    Character n-gram inverted index over the distinct values of a column. A lookup only reads
+    the posting lists of the term's n-grams and shortlists the values with the highest n-gram
+    overlap (Dice coefficient), so its cost grows with those lists rather than with the column.
+    Values are only ever appended; values that disappeared from the column are marked deleted
+    (get_value_index rebuilds the index once too many are).
+    """
+    def __init__(self, ngram=3):
+        self.ngram = ngram
+        self.values = []
+        self.choices = []
+        self.value_ids = {}
+        self.live = np.zeros(0, dtype=bool)
+        self.gram_counts = np.zeros(0, dtype=np.int32)
+        self.postings = {}
+
+    def __len__(self):
+        return int(self.live.sum())
+
+    def update(self, values):
+        """
+        Index the values not seen before and mark the ones no longer present as deleted.
+
+        Returns:
+            True if the index changed
+        """
+        new_values = [value for value in dict.fromkeys(values) if value not in self.value_ids]
+        start = len(self.values)
+        new_postings = {}
+        gram_counts = []
+        for value_id, value in enumerate(new_values, start):
+            choice = default_process(value)
+            grams = _ngrams(choice, self.ngram)
+            self.value_ids[value] = value_id
+            self.values.append(value)
+            self.choices.append(choice)
+            gram_counts.append(len(grams))
+            for gram in grams:
+                new_postings.setdefault(gram, []).append(value_id)
+        for gram, ids in new_postings.items():
+            ids = np.asarray(ids, dtype=np.int32)
+            existing = self.postings.get(gram)
+            self.postings[gram] = ids if existing is None else np.concatenate([existing, ids])
+        self.gram_counts = np.concatenate([self.gram_counts, np.asarray(gram_counts, dtype=np.int32)])
+
+        live = np.zeros(len(self.values), dtype=bool)
+        live[[self.value_ids[value] for value in values]] = True
+        changed = bool(new_values) or not np.array_equal(live[:start], self.live)
+        self.live = live
+        return changed
+
+    def candidates(self, term, limit=200):
+        """Ids of the (at most limit) live values sharing the most n-grams with the term, best first."""
+        grams = _ngrams(default_process(term), self.ngram)
+        postings = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not postings:
+            return np.zeros(0, dtype=np.int64)
+        # Very common n-grams say little and cost the most to read
+        max_length = VALUE_INDEX_CONFIG["max_posting_fraction"] * len(self.values)
+        postings = [ids for ids in postings if len(ids) <= max_length] or [min(postings, key=len)]
+        ids, counts = np.unique(np.concatenate(postings), return_counts=True)
+        live = self.live[ids]
+        ids, counts = ids[live], counts[live]
+        scores = 2 * counts / (len(grams) + self.gram_counts[ids])
+        return ids[top_k(scores, limit)]
+
+    def save(self, path):
+        """Write the index to a single .npz file, replaced atomically."""
+        grams = sorted(self.postings)
+        offsets = np.concatenate([[0], np.cumsum([len(self.postings[gram]) for gram in grams])]).astype(np.int64)
+        ids = np.concatenate([self.postings[gram] for gram in grams]) if grams else np.zeros(0, dtype=np.int32)
+        values = json.dumps({"ngram": self.ngram, "values": self.values, "choices": self.choices})
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A temp file of its own, so workers refreshing the same column never write into one file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    values=np.frombuffer(values.encode("utf-8"), dtype=np.uint8),
+                    grams=np.array(grams, dtype=str),
+                    offsets=offsets,
+                    ids=ids,
+                    gram_counts=self.gram_counts,
+                    live=self.live
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            values = json.loads(data["values"].tobytes().decode("utf-8"))
+            index = cls(values["ngram"])
+            index.values, index.choices = values["values"], values["choices"]
+            index.value_ids = {value: value_id for value_id, value in enumerate(index.values)}
+            index.gram_counts, index.live = data["gram_counts"], data["live"]
+            offsets, ids = data["offsets"], data["ids"]
+            index.postings = {
+                str(gram): ids[offsets[i]:offsets[i + 1]] for i, gram in enumerate(data["grams"])
+            }
+        return index
+
+def value_index_path(table_name, column_name):
+    file_name = re.sub(r"[^\w.-]", "_", f"{table_name}.{column_name}")
+    return os.path.join(VALUE_INDEX_CONFIG["index_dir"], f"{file_name}.npz")
+
+def get_value_index(table_name, column_name, values):
+    """
+    N-gram index of a column: loaded from index_dir when saved before, brought up to date
+    with the current distinct values (only new values are indexed) and saved if it changed.
+    It is rebuilt from the current values when more than max_deleted_fraction of its values
+    are no longer in the column, so the saved index does not only grow.
+    """
+    path = value_index_path(table_name, column_name)
+    index = None
+    if os.path.exists(path):
+        try:
+            index = NGramIndex.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Rebuilding value index {path}: {e}")
+        if index is not None and index.ngram != VALUE_INDEX_CONFIG["ngram"]:
+            index = None
+    if index is not None and index.values:
+        deleted = len(index.values) - sum(1 for value in dict.fromkeys(values) if value in index.value_ids)
+        if deleted > VALUE_INDEX_CONFIG["max_deleted_fraction"] * len(index.values):
+            print(f"Compacting value index {path}: {deleted} of {len(index.values)} values deleted")
+            index = None
+    if index is None:
+        index = NGramIndex(VALUE_INDEX_CONFIG["ngram"])
+    if index.update(values):
+        index.save(path)
+    return index
@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import random
+import string
+import tempfile
+
+# Add the project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from utils.fuzzy_match import ColumnMatcher
+from utils.value_index import VALUE_INDEX_CONFIG, configure_value_index, get_value_index
+
+def _with_typo(value):
+    position = random.randrange(len(value))
+    return value[:position] + random.choice(string.ascii_lowercase) + value[position + 1:]
+
+def main():
+    """Compare full scoring and n-gram index lookup on a high-cardinality synthetic column"""
+    random.seed(0)
+    first_names = ["".join(random.choices(string.ascii_lowercase, k=random.randint(4, 9))).title() for _ in range(3000)]
+    last_names = ["".join(random.choices(string.ascii_lowercase, k=random.randint(4, 9))).title() for _ in range(3000)]
+    values = list(dict.fromkeys(f"{random.choice(first_names)} {random.choice(last_names)}" for _ in range(500000)))
+    terms = [_with_typo(random.choice(values)).lower() for _ in range(50)]
+
+    original_dir = VALUE_INDEX_CONFIG["index_dir"]
+    with tempfile.TemporaryDirectory() as index_dir:
+        configure_value_index(index_dir=index_dir)
+        start = time.perf_counter()
+        get_value_index("people", "full_name", values)
+        print(f"\nBuilt n-gram index of {len(values)} values in {time.perf_counter() - start:.1f} s")
+
+        # Reloaded from disk, only the new value is indexed
+        start = time.perf_counter()
+        index = get_value_index("people", "full_name", values + ["Chathnya Reddy"])
+        print(f"Loaded and refreshed index in {time.perf_counter() - start:.1f} s ({len(index)} values)")
+
+        # Once most values are gone the index is rebuilt from the live ones instead of growing
+        compacted = get_value_index("people", "full_name", values[:len(values) // 2])
+        print(f"After deleting half the values: {len(compacted)} live of {len(compacted.values)} stored")
+
+        results = {}
+        for name, matcher in (("full", ColumnMatcher(values)), ("index", ColumnMatcher(values, index))):
+            start = time.perf_counter()
+            results[name] = [matcher.best_match(term) for term in terms]
+            print(f"{name:<6} {(time.perf_counter() - start) / len(terms) * 1000:.2f} ms per term")
+
+        agreement = sum(full["score"] == indexed["score"] for full, indexed in zip(results["full"], results["index"]))
+        print(f"Index found the best score for {agreement} of {len(terms)} terms")
+        configure_value_index(index_dir=original_dir)
+
+if __name__ == "__main__":
+    main()